@@ -0,0 +1,108 @@
+"""
+Benchmark the Ken Burns implementations against each other.
+
+Renders the same set of synthetic stills through the "zoompan" and "crop"
+motion paths of a render profile and reports wall time and encode speed.
+
+Usage (from the api directory):
+    python -m benchmarks.ken_burns
+    python -m benchmarks.ken_burns --scenes 7 --seconds 5 --format vertical --runs 3
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from services.video import FORMAT_DIMENSIONS, get_render_profile, image_track_graph
+
+METHODS = ["zoompan", "crop"]
+
+
+def make_stills(directory: Path, count: int, size: str) -> list[Path]:
+    """Render detailed test images, similar in size to Flux output."""
+    paths = []
+    for i in range(count):
+        path = directory / f"still_{i:02d}.png"
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-v", "error",
+                "-f", "lavfi", "-i", f"testsrc2=size={size}:rate=1",
+                "-vf", f"hue=h={i * 40}",
+                "-frames:v", "1",
+                str(path),
+            ],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def render(
+    stills: list[Path], seconds: float, output_format: str, profile, output: Path
+) -> float:
+    graph, labels = image_track_graph([seconds] * len(stills), [output_format], profile)
+    cmd = ["ffmpeg", "-y", "-v", "error"]
+    for path in stills:
+        cmd.extend(["-i", str(path)])
+    cmd.extend([
+        "-filter_complex", ";".join(graph),
+        "-map", f"[{labels[output_format]}]",
+        *profile.encoder_args(),
+        str(output),
+    ])
+
+    started = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=7)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--format", default="vertical", choices=list(FORMAT_DIMENSIONS))
+    parser.add_argument("--profile", default="final")
+    parser.add_argument("--image-size", default="1024x1792")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    base = get_render_profile(args.profile)
+    video_seconds = args.scenes * args.seconds
+
+    with tempfile.TemporaryDirectory(prefix="bom_bench_") as tmp:
+        tmp_dir = Path(tmp)
+        stills = make_stills(tmp_dir, args.scenes, args.image_size)
+
+        print(
+            f"{args.scenes} scenes x {args.seconds}s, {args.format} "
+            f"{'x'.join(map(str, base.dimensions(args.format)))}, "
+            f"profile {base.name} ({base.preset}, crf {base.crf}), {args.runs} runs"
+        )
+        results = {}
+        for method in METHODS:
+            profile = base.model_copy(
+                update={"ken_burns": True, "ken_burns_method": method}
+            )
+            output = tmp_dir / f"{method}.mp4"
+            timings = [
+                render(stills, args.seconds, args.format, profile, output)
+                for _ in range(args.runs)
+            ]
+            results[method] = statistics.median(timings)
+            print(
+                f"  {method:<8} median {results[method]:6.2f}s "
+                f"(min {min(timings):.2f}s)  "
+                f"{video_seconds / results[method]:5.2f}x realtime"
+            )
+
+        speedup = results["zoompan"] / results["crop"]
+        print(f"  crop is {speedup:.2f}x faster than zoompan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,12 +21,25 @@ class Settings(BaseSettings):
     # Database
     database_url: str = DEFAULT_DATABASE_URL
 
+    # Connection pool (ignored for in-memory SQLite)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: int = 30
+    db_pool_pre_ping: bool = True  # Detect connections dropped by the server or a proxy
+    db_pool_recycle_seconds: int = 1800
+    # How long SQLite waits for a competing writer before "database is locked"
+    sqlite_busy_timeout_ms: int = 5000
+
     @field_validator("database_url", mode="before")
     @classmethod
     def default_database_url(cls, v: str) -> str:
-        """Use default if empty string is provided."""
+        """Use default if empty string is provided; use asyncpg for Postgres URLs."""
         if v == "" or v is None:
             return DEFAULT_DATABASE_URL
+        # Hosting providers hand out postgres:// or postgresql:// URLs
+        for prefix in ("postgres://", "postgresql://"):
+            if v.startswith(prefix):
+                return "postgresql+asyncpg://" + v.removeprefix(prefix)
         return v
 
     # Auth
@@ -42,6 +55,36 @@ class Settings(BaseSettings):
     heygen_api_key: Optional[str] = None
     anthropic_api_key: Optional[str] = None
 
+    # Replicate prediction completion
+    replicate_webhook_url: Optional[str] = None  # Public URL of /api/webhooks/replicate
+    replicate_webhook_secret: Optional[str] = None  # whsec_... signing secret
+    replicate_sync_wait_seconds: int = 10  # "Prefer: wait" on create, 0 disables
+    replicate_poll_initial_seconds: float = 0.5  # Backoff start when polling
+    replicate_poll_max_seconds: float = 5.0  # Backoff ceiling when polling
+    replicate_webhook_fallback_seconds: float = 15.0  # Safety poll when webhooks on
+    replicate_batch_poll_threshold: int = 4  # Due predictions before one list call
+    replicate_prediction_timeout_seconds: float = 120.0
+    replicate_webhook_retention_seconds: int = 3600  # Unclaimed webhook rows
+
+    # Shared scheduler limits per provider; callers queue instead of failing
+    provider_limits: dict[str, dict[str, float]] = {
+        "anthropic": {"max_concurrency": 5, "rate_per_second": 1.0, "burst": 5},
+        "replicate": {"max_concurrency": 10, "rate_per_second": 5.0, "burst": 10},
+        # Prediction status polls, separate from the creation slots above
+        "replicate_status": {"max_concurrency": 4, "rate_per_second": 5.0, "burst": 5},
+        "elevenlabs": {"max_concurrency": 3, "rate_per_second": 2.0, "burst": 3},
+        "google_drive": {"max_concurrency": 2, "rate_per_second": 3.0, "burst": 5},
+    }
+
+    # Pooled HTTP clients per provider (timeouts in seconds). Keys not set fall
+    # back to services.http.DEFAULT_PROVIDER_HTTP.
+    provider_http: dict[str, dict[str, float]] = {
+        "anthropic": {"timeout": 60.0, "max_connections": 10},
+        "replicate": {"timeout": 30.0, "max_connections": 20},
+        "elevenlabs": {"timeout": 60.0, "max_connections": 10},
+        "downloads": {"timeout": 60.0, "max_connections": 20},
+    }
+
     # Google Drive
     google_service_account_json: Optional[str] = None  # JSON string of service account credentials
     google_drive_folder_id: Optional[str] = None  # Root folder ID for BOM Studios videos
@@ -53,6 +96,76 @@ class Settings(BaseSettings):
     resend_from_email: str = "BOM Studios <onboarding@resend.dev>"  # Use verified domain when available
     n8n_webhook_url: Optional[str] = None
 
+    # Job queue / worker pool
+    worker_concurrency: int = 4  # Jobs claimed in parallel per worker process
+    worker_poll_interval_seconds: float = 2.0
+    job_lease_seconds: int = 300  # Lease is renewed while a job runs
+    job_max_attempts: int = 3
+    job_reap_interval_seconds: float = 60.0  # Fails final attempts with lapsed leases
+    job_retry_backoff_seconds: int = 30  # Multiplied by the attempt number
+    worker_metrics_interval_seconds: float = 60.0  # Metrics log line, 0 disables
+    # Max concurrent executions of each pipeline stage per worker process
+    pipeline_stage_concurrency: dict[str, int] = {
+        "script": 4,
+        "images": 2,
+        "voiceover": 4,
+        "render": 4,  # CPU use is governed by the render scheduler
+    }
+
+    # "per_scene" synthesizes each scene's narration concurrently and times
+    # images to the measured clips; "single" sends the whole script at once
+    voiceover_mode: str = "per_scene"
+
+    # FFmpeg render scheduler. Concurrent encodes default to cores // threads.
+    render_threads_per_job: int = 4
+    render_max_concurrent: Optional[int] = None
+
+    # Formats rendered by the pipeline
+    render_formats: list[str] = ["vertical", "square", "horizontal"]
+    # "segments" encodes each scene separately in parallel and joins them
+    # with stream copy; "single_pass" renders every format in one FFmpeg run
+    render_assembly: str = "segments"
+    render_segment_threads: int = 2  # Encoder threads per scene segment
+    # Profile for pipeline review copies (see services.video.RENDER_PROFILES);
+    # approval re-renders with "final"
+    pipeline_render_profile: str = "draft"
+
+    # Asset downloads for rendering
+    download_chunk_size: int = 1024 * 1024  # Bytes per streamed write
+    download_max_attempts: int = 3  # Interrupted downloads resume via Range
+
+    # Object storage for generated media (see services.storage).
+    # "local" keeps files under media_dir; "s3" uses any S3-compatible bucket.
+    storage_backend: str = "local"
+    media_dir: str = "./data/media"
+    s3_bucket: Optional[str] = None
+    s3_prefix: str = ""
+    s3_endpoint_url: Optional[str] = None  # e.g. http://localhost:9000 for MinIO
+    s3_region: Optional[str] = None
+    s3_access_key_id: Optional[str] = None
+    s3_secret_access_key: Optional[str] = None
+    storage_multipart_chunk_bytes: int = 8 * 1024 * 1024
+
+    # Scratch directories for renders (see services.workspace)
+    workspace_dir: str = "./data/workspaces"
+    workspace_max_bytes: int = 2 * 1024**3  # Quota per render
+    workspace_max_total_bytes: int = 20 * 1024**3  # Sweeper keeps the total under this
+    # Failed renders are kept this long for inspection
+    workspace_keep_failed_seconds: int = 60 * 60 * 24
+    workspace_stale_seconds: int = 60 * 60 * 6  # Unfinished and untouched: process died
+    workspace_sweep_interval_seconds: int = 600
+
+    # Persistent provider result caches
+    cache_dir: str = "./data/cache"
+    llm_cache_ttl_seconds: int = 60 * 60 * 24 * 30  # 30 days
+    llm_cache_max_entries: int = 10_000
+    image_cache_ttl_seconds: int = 60 * 60 * 24 * 90  # 90 days
+    image_cache_max_entries: int = 50_000
+    media_probe_cache_ttl_seconds: int = 60 * 60 * 24 * 90  # 90 days
+    media_probe_cache_max_entries: int = 50_000
+    voice_cache_max_bytes: int = 2 * 1024**3  # 2 GB of voiceover audio
+    segment_cache_max_bytes: int = 5 * 1024**3  # 5 GB of encoded scene segments
+
     # Portal URL for magic links
     portal_url: str = "https://bom-studios.vercel.app"
 
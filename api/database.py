@@ -1,23 +1,26 @@
-import os
+import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 # Determine database URL - handle container environments
 database_url = settings.database_url
+url = make_url(database_url)
+is_sqlite = url.get_backend_name() == "sqlite"
+is_memory = is_sqlite and url.database in (None, "", ":memory:")
 
-if "sqlite" in database_url and ":memory:" not in database_url:
-    db_path = database_url.replace("sqlite+aiosqlite:///", "")
-    if db_path.startswith("./"):
-        db_path = db_path[2:]
-    db_dir = Path(db_path).parent
+if is_sqlite and not is_memory:
+    db_dir = Path(url.database).parent
     try:
         db_dir.mkdir(parents=True, exist_ok=True)
         # Test if we can write to this directory
@@ -25,17 +28,48 @@ if "sqlite" in database_url and ":memory:" not in database_url:
         test_file.touch()
         test_file.unlink()
     except (OSError, PermissionError):
-        # Fall back to /tmp for container environments
+        # Fall back to /tmp for read-only container filesystems. Data there
+        # does not survive a restart, so make it loud.
         tmp_path = Path("/tmp/bom_data")
         tmp_path.mkdir(parents=True, exist_ok=True)
         database_url = f"sqlite+aiosqlite:///{tmp_path}/bom.db"
-        print(f"Using temp database at {database_url}")
+        logger.warning(
+            f"Cannot write to {db_dir}; using temporary database {database_url}. "
+            f"Data will be lost on restart; set DATABASE_URL to a writable location."
+        )
 
-engine = create_async_engine(
-    database_url,
-    echo=settings.debug,
-)
+engine_options = {"echo": settings.debug}
+if not is_memory:
+    engine_options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+
+engine = create_async_engine(database_url, **engine_options)
+
+if is_sqlite:
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record) -> None:
+        """
+        Tune every SQLite connection for concurrent web and worker processes.
 
+        WAL lets readers run alongside a writer, NORMAL sync is safe with WAL
+        and avoids an fsync per commit, and busy_timeout makes a writer wait
+        for the lock instead of failing with "database is locked".
+        """
+        cursor = dbapi_connection.cursor()
+        if not is_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.close()
+
+# Model defaults (ids, timestamps) are all Python-side, so flush() leaves the
+# instance complete and write routes need no refresh() round trip.
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -68,6 +102,51 @@ async def get_session_context() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+# Revision matching the schema create_all built before migrations existed
+BASELINE_REVISION = "0001"
+
+
+def _upgrade_schema(connection) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(Path(__file__).parent / "alembic.ini"))
+    config.attributes["connection"] = connection
+
+    tables = set(inspect(connection).get_table_names())
+    if "alembic_version" not in tables and "clients" in tables:
+        # Created by create_all before migrations; record it as the baseline
+        logger.info(f"Stamping existing database at revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+    _check_schema(connection)
+
+
+def _check_schema(connection) -> None:
+    """Fail at startup, not mid-request, if a model column has no migration."""
+    import models  # noqa: F401  (registers every table on Base.metadata)
+
+    inspector = inspect(connection)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            missing.append(table.name)
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [
+            f"{table.name}.{column.name}"
+            for column in table.columns
+            if column.name not in existing
+        ]
+    if missing:
+        raise RuntimeError(
+            f"Database schema is missing {', '.join(missing)} after migrating; "
+            f"add a migration for these model changes"
+        )
+
+
 async def init_db() -> None:
+    """Bring the schema up to date by applying pending Alembic migrations."""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade_schema)
@@ -8,6 +8,10 @@ from fastapi.responses import JSONResponse
 from config import get_settings
 from database import init_db
 from routers import auth, clients, projects, videos, webhooks
+from services.http import provider_clients
+from services.render_queue import render_scheduler
+from services.scheduler import provider_metrics
+from utils.pagination import NEXT_CURSOR_HEADER
 
 settings = get_settings()
 
@@ -16,8 +20,10 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    provider_clients.start()
     yield
     # Shutdown
+    await provider_clients.aclose()
 
 
 app = FastAPI(
@@ -33,6 +39,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -87,6 +94,17 @@ async def health_check() -> dict[str, Any]:
     }
 
 
+# Provider and render scheduler metrics (queue depth, wait times) for the web
+# process only; the pipeline runs in worker.py, which logs its own.
+@app.get("/metrics")
+async def metrics() -> dict[str, Any]:
+    return {
+        "process": "web",
+        "providers": provider_metrics(),
+        "render": render_scheduler.metrics(),
+    }
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(clients.router, prefix="/api/clients", tags=["clients"])
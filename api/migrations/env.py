@@ -0,0 +1,57 @@
+"""Alembic environment.
+
+Uses the app's engine, so DATABASE_URL and its normalization (asyncpg for
+Postgres, the SQLite fallback) apply to migrations too. When called from
+database.init_db the already-open connection is passed in through
+config.attributes["connection"].
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.engine import Connection
+
+import models  # noqa: F401  (registers every table on Base.metadata)
+from database import Base, database_url, engine
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of running it (alembic upgrade head --sql)."""
+    context.configure(
+        url=database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite cannot ALTER most things in place; batch mode recreates the table
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(do_run_migrations)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    do_run_migrations(config.attributes["connection"])
+else:
+    if config.config_file_name:
+        fileConfig(config.config_file_name)
+    asyncio.run(run_migrations_online())
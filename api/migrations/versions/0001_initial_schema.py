@@ -0,0 +1,113 @@
+"""Initial schema: clients, projects, videos, assets, api_usage
+
+Matches what Base.metadata.create_all produced before migrations were
+introduced, so existing databases are stamped at this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+JSONType = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "clients",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("package", sa.String(50), nullable=False),
+        sa.Column("brand_kit", JSONType, nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_clients_email", "clients", ["email"], unique=True)
+
+    op.create_table(
+        "projects",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column(
+            "client_id",
+            sa.String(36),
+            sa.ForeignKey("clients.id"),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_projects_client_id", "projects", ["client_id"])
+
+    op.create_table(
+        "videos",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column(
+            "project_id",
+            sa.String(36),
+            sa.ForeignKey("projects.id"),
+            nullable=False,
+        ),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("script", JSONType, nullable=True),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("formats", JSONType, nullable=True),
+        sa.Column("cost_cents", sa.Integer(), nullable=False),
+        sa.Column("approval_note", sa.Text(), nullable=True),
+        sa.Column("approved_at", sa.DateTime(), nullable=True),
+        sa.Column("delivery_url", sa.Text(), nullable=True),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_videos_project_id", "videos", ["project_id"])
+
+    op.create_table(
+        "assets",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column(
+            "video_id",
+            sa.String(36),
+            sa.ForeignKey("videos.id"),
+            nullable=False,
+        ),
+        sa.Column("type", sa.String(50), nullable=False),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("meta", JSONType, nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_assets_video_id", "assets", ["video_id"])
+
+    op.create_table(
+        "api_usage",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("provider", sa.String(50), nullable=False),
+        sa.Column("action", sa.String(100), nullable=False),
+        sa.Column(
+            "project_id",
+            sa.String(36),
+            sa.ForeignKey("projects.id"),
+            nullable=True,
+        ),
+        sa.Column("cost_cents", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_api_usage_project_id", "api_usage", ["project_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("api_usage")
+    op.drop_table("assets")
+    op.drop_table("videos")
+    op.drop_table("projects")
+    op.drop_table("clients")
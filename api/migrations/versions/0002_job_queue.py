@@ -0,0 +1,85 @@
+"""Job queue, Replicate webhook results and pipeline checkpoints
+
+Databases set up with create_all after the job queue landed may already
+have some of these tables and columns, so each step checks first.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+JSONType = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def _columns(inspector, table: str) -> set[str]:
+    return {c["name"] for c in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        # Offline SQL generation (--sql) cannot inspect; assume a 0001 schema
+        inspector, tables = None, set()
+    else:
+        inspector = sa.inspect(op.get_bind())
+        tables = set(inspector.get_table_names())
+
+    if not inspector or "pipeline_state" not in _columns(inspector, "videos"):
+        op.add_column("videos", sa.Column("pipeline_state", JSONType, nullable=True))
+
+    if "jobs" not in tables:
+        op.create_table(
+            "jobs",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("kind", sa.String(50), nullable=False),
+            sa.Column("payload", JSONType, nullable=False),
+            sa.Column("status", sa.String(50), nullable=False),
+            sa.Column("dedupe_key", sa.String(255), nullable=True, unique=True),
+            sa.Column(
+                "video_id",
+                sa.String(36),
+                sa.ForeignKey("videos.id"),
+                nullable=True,
+            ),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("max_attempts", sa.Integer(), nullable=False),
+            sa.Column("run_after", sa.DateTime(), nullable=False),
+            sa.Column("lease_owner", sa.String(100), nullable=True),
+            sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_jobs_kind", "jobs", ["kind"])
+        op.create_index("ix_jobs_status", "jobs", ["status"])
+        op.create_index("ix_jobs_video_id", "jobs", ["video_id"])
+    elif "video_id" not in _columns(inspector, "jobs"):
+        with op.batch_alter_table("jobs") as batch:
+            batch.add_column(sa.Column("video_id", sa.String(36), nullable=True))
+            batch.create_foreign_key("fk_jobs_video_id", "videos", ["video_id"], ["id"])
+        op.create_index("ix_jobs_video_id", "jobs", ["video_id"])
+
+    if "replicate_predictions" not in tables:
+        op.create_table(
+            "replicate_predictions",
+            sa.Column("id", sa.String(64), primary_key=True),
+            sa.Column("status", sa.String(50), nullable=False),
+            sa.Column("output", JSONType, nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("replicate_predictions")
+    op.drop_table("jobs")
+    with op.batch_alter_table("videos") as batch:
+        batch.drop_column("pipeline_state")
@@ -0,0 +1,61 @@
+"""Composite indexes for the hot list and claim queries
+
+- list_videos: a project's videos, optionally by status, newest first
+- list_projects: a client's projects, optionally by status, newest first
+- list_clients: all clients, newest first
+- claim_job: queued jobs whose run_after has passed, oldest first
+
+The single-column project_id/client_id indexes are leading prefixes of the
+new ones and are dropped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_videos_project_id_status_created_at",
+        "videos",
+        ["project_id", "status", "created_at"],
+    )
+    op.create_index(
+        "ix_videos_project_id_created_at", "videos", ["project_id", "created_at"]
+    )
+    op.drop_index("ix_videos_project_id", table_name="videos")
+
+    op.create_index(
+        "ix_projects_client_id_created_at", "projects", ["client_id", "created_at"]
+    )
+    op.create_index(
+        "ix_projects_client_id_status_created_at",
+        "projects",
+        ["client_id", "status", "created_at"],
+    )
+    op.drop_index("ix_projects_client_id", table_name="projects")
+
+    op.create_index("ix_clients_created_at", "clients", ["created_at"])
+
+    op.create_index("ix_jobs_status_run_after", "jobs", ["status", "run_after"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_status_run_after", table_name="jobs")
+
+    op.drop_index("ix_clients_created_at", table_name="clients")
+
+    op.create_index("ix_projects_client_id", "projects", ["client_id"])
+    op.drop_index("ix_projects_client_id_status_created_at", table_name="projects")
+    op.drop_index("ix_projects_client_id_created_at", table_name="projects")
+
+    op.create_index("ix_videos_project_id", "videos", ["project_id"])
+    op.drop_index("ix_videos_project_id_created_at", table_name="videos")
+    op.drop_index("ix_videos_project_id_status_created_at", table_name="videos")
@@ -0,0 +1,62 @@
+"""Extend the newest-first indexes with id for keyset pagination
+
+List endpoints page on (created_at, id); with id in the index the order and
+the cursor comparison are both served by the index, without sorting ties.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# (table, old index, new index, new columns)
+INDEXES = [
+    (
+        "clients",
+        "ix_clients_created_at",
+        "ix_clients_created_at_id",
+        ["created_at", "id"],
+    ),
+    (
+        "projects",
+        "ix_projects_client_id_created_at",
+        "ix_projects_client_id_created_at_id",
+        ["client_id", "created_at", "id"],
+    ),
+    (
+        "projects",
+        "ix_projects_client_id_status_created_at",
+        "ix_projects_client_id_status_created_at_id",
+        ["client_id", "status", "created_at", "id"],
+    ),
+    (
+        "videos",
+        "ix_videos_project_id_created_at",
+        "ix_videos_project_id_created_at_id",
+        ["project_id", "created_at", "id"],
+    ),
+    (
+        "videos",
+        "ix_videos_project_id_status_created_at",
+        "ix_videos_project_id_status_created_at_id",
+        ["project_id", "status", "created_at", "id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    for table, old, new, columns in INDEXES:
+        op.create_index(new, table, columns)
+        op.drop_index(old, table_name=table)
+
+
+def downgrade() -> None:
+    for table, old, new, columns in INDEXES:
+        op.create_index(old, table, columns[:-1])
+        op.drop_index(new, table_name=table)
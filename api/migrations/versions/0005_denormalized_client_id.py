@@ -0,0 +1,66 @@
+"""Store client_id on videos and assets
+
+Ownership checks and client-wide video listings filter on videos.client_id
+directly instead of joining projects. Existing rows are backfilled from their
+project (videos) and video (assets).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("client_id", sa.String(36), nullable=True))
+    op.add_column("assets", sa.Column("client_id", sa.String(36), nullable=True))
+
+    op.execute(
+        "UPDATE videos SET client_id = "
+        "(SELECT projects.client_id FROM projects"
+        " WHERE projects.id = videos.project_id)"
+    )
+    op.execute(
+        "UPDATE assets SET client_id = "
+        "(SELECT videos.client_id FROM videos WHERE videos.id = assets.video_id)"
+    )
+
+    with op.batch_alter_table("videos") as batch:
+        batch.alter_column("client_id", existing_type=sa.String(36), nullable=False)
+        batch.create_foreign_key(
+            "fk_videos_client_id", "clients", ["client_id"], ["id"]
+        )
+    with op.batch_alter_table("assets") as batch:
+        batch.alter_column("client_id", existing_type=sa.String(36), nullable=False)
+        batch.create_foreign_key(
+            "fk_assets_client_id", "clients", ["client_id"], ["id"]
+        )
+
+    op.create_index(
+        "ix_videos_client_id_created_at_id", "videos", ["client_id", "created_at", "id"]
+    )
+    op.create_index(
+        "ix_videos_client_id_status_created_at_id",
+        "videos",
+        ["client_id", "status", "created_at", "id"],
+    )
+    op.create_index("ix_assets_client_id", "assets", ["client_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assets_client_id", table_name="assets")
+    op.drop_index("ix_videos_client_id_status_created_at_id", table_name="videos")
+    op.drop_index("ix_videos_client_id_created_at_id", table_name="videos")
+    with op.batch_alter_table("assets") as batch:
+        batch.drop_constraint("fk_assets_client_id", type_="foreignkey")
+        batch.drop_column("client_id")
+    with op.batch_alter_table("videos") as batch:
+        batch.drop_constraint("fk_videos_client_id", type_="foreignkey")
+        batch.drop_column("client_id")
@@ -1,4 +1,12 @@
-from models.db import APIUsage, Asset, Client, Project, Video
+from models.db import (
+    APIUsage,
+    Asset,
+    Client,
+    Job,
+    Project,
+    ReplicatePrediction,
+    Video,
+)
 from models.schemas import (
     APIUsageResponse,
     AssetCreate,
@@ -22,6 +30,8 @@ __all__ = [
     "Video",
     "Asset",
     "APIUsage",
+    "Job",
+    "ReplicatePrediction",
     # Schemas
     "ClientCreate",
     "ClientUpdate",
@@ -2,12 +2,15 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, String, Text
-from sqlalchemy.dialects.sqlite import JSON
+from sqlalchemy import JSON, ForeignKey, Index, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import Base
 
+# JSON on SQLite, JSONB (binary, indexable) on Postgres
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 def generate_uuid() -> str:
     return str(uuid.uuid4())
@@ -15,6 +18,8 @@ def generate_uuid() -> str:
 
 class Client(Base):
     __tablename__ = "clients"
+    # list_clients: newest first (keyset on created_at, id)
+    __table_args__ = (Index("ix_clients_created_at_id", "created_at", "id"),)
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=generate_uuid
@@ -22,7 +27,7 @@ class Client(Base):
     name: Mapped[str] = mapped_column(String(255))
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     package: Mapped[str] = mapped_column(String(50), default="kickstart")
-    brand_kit: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    brand_kit: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         default=datetime.utcnow, onupdate=datetime.utcnow
@@ -36,16 +41,26 @@ class Client(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # list_projects: by client, optionally by status, newest first (keyset on
+        # created_at, id)
+        Index("ix_projects_client_id_created_at_id", "client_id", "created_at", "id"),
+        Index(
+            "ix_projects_client_id_status_created_at_id",
+            "client_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=generate_uuid
     )
-    client_id: Mapped[str] = mapped_column(
-        String(36), ForeignKey("clients.id"), index=True
-    )
+    client_id: Mapped[str] = mapped_column(String(36), ForeignKey("clients.id"))
     name: Mapped[str] = mapped_column(String(255))
     status: Mapped[str] = mapped_column(String(50), default="draft")
-    # Status values: draft, in_progress, review, approved, delivered
+    # Status values: draft, in_progress, review, approved, delivered, failed
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         default=datetime.utcnow, onupdate=datetime.utcnow
@@ -60,20 +75,46 @@ class Project(Base):
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        # list_videos: by project, optionally by status, newest first (keyset on
+        # created_at, id)
+        Index("ix_videos_project_id_created_at_id", "project_id", "created_at", "id"),
+        Index(
+            "ix_videos_project_id_status_created_at_id",
+            "project_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        # list_videos without a project filter: by client, optionally by status
+        Index("ix_videos_client_id_created_at_id", "client_id", "created_at", "id"),
+        Index(
+            "ix_videos_client_id_status_created_at_id",
+            "client_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=generate_uuid
     )
-    project_id: Mapped[str] = mapped_column(
-        String(36), ForeignKey("projects.id"), index=True
-    )
+    project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"))
+    client_id: Mapped[str] = mapped_column(String(36), ForeignKey("clients.id"))
+    # Copy of project.client_id so ownership checks need no join; set on insert
     title: Mapped[str] = mapped_column(String(255))
-    script: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    script: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
     # Script format: {"hook": "...", "scenes": [...], "cta": "..."}
     status: Mapped[str] = mapped_column(String(50), default="scripting")
-    # Status values: scripting, generating, rendering, draft, approved, delivered
-    formats: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
-    # Formats: {"vertical": "url", "square": "url", "horizontal": "url"}
+    # Status values: scripting, generating, rendering, draft, approved, delivered,
+    # failed (generation gave up; checkpoints are kept)
+    formats: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
+    # Formats: {"vertical": key, "square": key, "horizontal": key}, storage keys
+    # (see services.storage)
+    pipeline_state: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
+    # Pipeline checkpoints not stored elsewhere:
+    # {"image_prompts": [...], "failed_stage": "...", "render_profile": "draft"}
     cost_cents: Mapped[int] = mapped_column(default=0)
     approval_note: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     approved_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
@@ -100,10 +141,14 @@ class Asset(Base):
     video_id: Mapped[str] = mapped_column(
         String(36), ForeignKey("videos.id"), index=True
     )
+    client_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("clients.id"), index=True
+    )
+    # Copy of video.client_id, set on insert
     type: Mapped[str] = mapped_column(String(50))
     # Type values: image, audio, music, clip
-    url: Mapped[str] = mapped_column(Text)
-    meta: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    url: Mapped[str] = mapped_column(Text)  # Storage key, or an external URL
+    meta: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
 
     # Relationships
@@ -125,3 +170,49 @@ class APIUsage(Base):
     )
     cost_cents: Mapped[int] = mapped_column(default=0)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # claim_job: queued jobs that are due, in run_after order
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=generate_uuid
+    )
+    kind: Mapped[str] = mapped_column(String(50), index=True)
+    # Kind values: video_pipeline, render_final
+    payload: Mapped[dict] = mapped_column(JSONType, default=dict)
+    status: Mapped[str] = mapped_column(String(50), default="queued", index=True)
+    # Status values: queued, running, succeeded, failed
+    dedupe_key: Mapped[Optional[str]] = mapped_column(
+        String(255), unique=True, nullable=True
+    )
+    video_id: Mapped[Optional[str]] = mapped_column(
+        String(36), ForeignKey("videos.id"), nullable=True, index=True
+    )
+    attempts: Mapped[int] = mapped_column(default=0)
+    max_attempts: Mapped[int] = mapped_column(default=3)
+    run_after: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class ReplicatePrediction(Base):
+    """Completed predictions delivered by Replicate's webhook, until consumed."""
+
+    __tablename__ = "replicate_predictions"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    status: Mapped[str] = mapped_column(String(50))
+    # Status values: succeeded, failed, canceled
+    output: Mapped[Optional[list]] = mapped_column(JSONType, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
@@ -1,12 +1,13 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_session
 from models.db import Client
 from models.schemas import ClientCreate, ClientResponse, ClientUpdate
+from utils.pagination import CURSOR_DESCRIPTION, finish_page, paginate
 
 router = APIRouter()
 
@@ -16,13 +17,15 @@ Session = Annotated[AsyncSession, Depends(get_session)]
 @router.get("", response_model=list[ClientResponse])
 async def list_clients(
     session: Session,
+    response: Response,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
 ):
-    """List all clients with pagination."""
-    stmt = select(Client).offset(skip).limit(limit).order_by(Client.created_at.desc())
+    """List all clients with pagination, newest first (cursor or offset)."""
+    stmt = paginate(select(Client), Client, cursor, skip, limit)
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return finish_page(result.scalars().all(), limit, response)
 
 
 @router.post("", response_model=ClientResponse, status_code=201)
@@ -43,7 +46,6 @@ async def create_client(
     client = Client(**client_in.model_dump())
     session.add(client)
     await session.flush()
-    await session.refresh(client)
     return client
 
 
@@ -92,7 +94,6 @@ async def update_client(
         setattr(client, field, value)
 
     await session.flush()
-    await session.refresh(client)
     return client
 
 
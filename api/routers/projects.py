@@ -1,6 +1,6 @@
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -14,6 +14,7 @@ from models.schemas import (
     ProjectWithVideos,
 )
 from services.auth import CurrentClient, get_current_client
+from utils.pagination import CURSOR_DESCRIPTION, finish_page, paginate
 
 router = APIRouter()
 
@@ -25,19 +26,21 @@ AuthClient = Annotated[CurrentClient, Depends(get_current_client)]
 async def list_projects(
     session: Session,
     client: AuthClient,
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
 ):
-    """List projects for the authenticated client."""
+    """List projects for the authenticated client, newest first (cursor paginated)."""
     stmt = select(Project).where(Project.client_id == client.client_id)
 
     if status:
         stmt = stmt.where(Project.status == status)
 
-    stmt = stmt.offset(skip).limit(limit).order_by(Project.created_at.desc())
+    stmt = paginate(stmt, Project, cursor, skip, limit)
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return finish_page(result.scalars().all(), limit, response)
 
 
 @router.post("", response_model=ProjectResponse, status_code=201)
@@ -54,7 +57,6 @@ async def create_project(
     project = Project(**project_in.model_dump())
     session.add(project)
     await session.flush()
-    await session.refresh(project)
     return project
 
 
@@ -101,7 +103,6 @@ async def update_project(
         setattr(project, field, value)
 
     await session.flush()
-    await session.refresh(project)
     return project
 
 
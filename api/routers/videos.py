@@ -1,8 +1,9 @@
+import asyncio
 import logging
 from datetime import datetime
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -17,6 +18,10 @@ from models.schemas import (
     VideoWithAssets,
 )
 from services.auth import CurrentClient, get_current_client
+from services.jobs import enqueue_job
+from services.pipeline import needs_final_render
+from services.scheduler import provider_slot
+from utils.pagination import CURSOR_DESCRIPTION, finish_page, paginate
 
 logger = logging.getLogger(__name__)
 
@@ -29,12 +34,8 @@ AuthClient = Annotated[CurrentClient, Depends(get_current_client)]
 async def get_video_for_client(
     session: AsyncSession, video_id: str, client_id: str
 ) -> Video | None:
-    """Get a video, verifying it belongs to the client via its project."""
-    stmt = (
-        select(Video)
-        .join(Project)
-        .where(Video.id == video_id, Project.client_id == client_id)
-    )
+    """Get a video, verifying it belongs to the client."""
+    stmt = select(Video).where(Video.id == video_id, Video.client_id == client_id)
     result = await session.execute(stmt)
     return result.scalar_one_or_none()
 
@@ -43,22 +44,29 @@ async def get_video_for_client(
 async def list_videos(
     session: Session,
     client: AuthClient,
+    response: Response,
     project_id: Optional[str] = Query(None, description="Filter by project ID"),
     status: Optional[str] = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
 ):
-    """List videos for the authenticated client."""
-    stmt = select(Video).join(Project).where(Project.client_id == client.client_id)
+    """
+    List videos for the authenticated client, newest first.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next
+    page; the header is absent on the last page.
+    """
+    stmt = select(Video).where(Video.client_id == client.client_id)
 
     if project_id:
         stmt = stmt.where(Video.project_id == project_id)
     if status:
         stmt = stmt.where(Video.status == status)
 
-    stmt = stmt.offset(skip).limit(limit).order_by(Video.created_at.desc())
+    stmt = paginate(stmt, Video, cursor, skip, limit)
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return finish_page(result.scalars().all(), limit, response)
 
 
 @router.post("", response_model=VideoResponse, status_code=201)
@@ -76,10 +84,9 @@ async def create_video(
     if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Project not found")
 
-    video = Video(**video_in.model_dump())
+    video = Video(**video_in.model_dump(), client_id=client.client_id)
     session.add(video)
     await session.flush()
-    await session.refresh(video)
     return video
 
 
@@ -92,8 +99,7 @@ async def get_video(
     """Get a video by ID with its assets."""
     stmt = (
         select(Video)
-        .join(Project)
-        .where(Video.id == video_id, Project.client_id == client.client_id)
+        .where(Video.id == video_id, Video.client_id == client.client_id)
         .options(selectinload(Video.assets))
     )
     result = await session.execute(stmt)
@@ -123,7 +129,6 @@ async def update_video(
         setattr(video, field, value)
 
     await session.flush()
-    await session.refresh(video)
     return video
 
 
@@ -149,6 +154,16 @@ async def approve_video(
     if approval.approved:
         video.status = "approved"
         video.approved_at = datetime.utcnow()
+
+        # Drafts were rendered fast for review; spend full quality now
+        if needs_final_render(video):
+            await enqueue_job(
+                session,
+                kind="render_final",
+                payload={"video_id": video.id},
+                dedupe_key=f"render_final:{video.id}:{video.approved_at.isoformat()}",
+                video_id=video.id,
+            )
     else:
         video.status = "draft"  # Back to draft for revision
 
@@ -156,7 +171,6 @@ async def approve_video(
         video.approval_note = approval.note
 
     await session.flush()
-    await session.refresh(video)
     return video
 
 
@@ -184,7 +198,6 @@ async def reject_video(
         video.approval_note = approval.note
 
     await session.flush()
-    await session.refresh(video)
     return video
 
 
@@ -208,7 +221,6 @@ async def submit_video(
 
     video.status = "review"
     await session.flush()
-    await session.refresh(video)
     return video
 
 
@@ -245,8 +257,7 @@ async def deliver_video(
     # Get video with project and client info, verifying ownership
     stmt = (
         select(Video)
-        .join(Project)
-        .where(Video.id == video_id, Project.client_id == client.client_id)
+        .where(Video.id == video_id, Video.client_id == client.client_id)
         .options(selectinload(Video.project).selectinload(Project.client))
     )
     result = await session.execute(stmt)
@@ -267,6 +278,12 @@ async def deliver_video(
             detail="Video has no rendered formats to deliver",
         )
 
+    if needs_final_render(video):
+        raise HTTPException(
+            status_code=409,
+            detail="Final-quality render is still in progress",
+        )
+
     # Import here to avoid circular imports and allow graceful failure if not configured
     try:
         from services.google_drive import drive_service
@@ -274,8 +291,13 @@ async def deliver_video(
         # Get client name for folder
         client_name = video.project.client.name if video.project and video.project.client else "Unknown"
 
-        # Create client folder if needed
-        folder_id = drive_service.create_client_folder(client_name)
+        # Drive calls are blocking; run them off the event loop under the
+        # shared Google Drive rate limit
+        async with provider_slot("google_drive"):
+            # Create client folder if needed
+            folder_id = await asyncio.to_thread(
+                drive_service.create_client_folder, client_name
+            )
 
         # Upload the video (use vertical format as primary)
         video_url = video.formats.get("vertical") or list(video.formats.values())[0]
@@ -286,14 +308,21 @@ async def deliver_video(
             "web_view_link": f"https://drive.google.com/drive/folders/{folder_id}"
         }
 
-        # Set permissions (anyone with link can view)
-        drive_service.set_file_permissions(folder_id, anyone_with_link=True)
-
-        # Share with client if they have an email
-        if video.project and video.project.client:
-            client_email = video.project.client.email
-            if client_email:
-                drive_service.set_file_permissions(folder_id, email=client_email)
+        async with provider_slot("google_drive"):
+            # Set permissions (anyone with link can view)
+            await asyncio.to_thread(
+                drive_service.set_file_permissions, folder_id, anyone_with_link=True
+            )
+
+            # Share with client if they have an email
+            if video.project and video.project.client:
+                client_email = video.project.client.email
+                if client_email:
+                    await asyncio.to_thread(
+                        drive_service.set_file_permissions,
+                        folder_id,
+                        email=client_email,
+                    )
 
         # Update video
         video.delivery_url = upload_result["web_view_link"]
@@ -320,5 +349,4 @@ async def deliver_video(
         )
 
     await session.flush()
-    await session.refresh(video)
     return video
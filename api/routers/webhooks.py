@@ -1,16 +1,19 @@
 """Webhook handlers for external integrations."""
 
-from typing import Any, Optional
+from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_session_context
-from models.db import Client, Project, Video
+from database import get_session
+from services.jobs import enqueue_job
+from services.replicate import store_webhook_prediction, verify_webhook_signature
 
 router = APIRouter()
 
+Session = Annotated[AsyncSession, Depends(get_session)]
+
 
 # ---------- Tally Form Webhook ----------
 
@@ -31,12 +34,13 @@ class TallyWebhookResponse(BaseModel):
     status: str
     message: str
     video_id: Optional[str] = None
+    job_id: Optional[str] = None
 
 
 @router.post("/tally", response_model=TallyWebhookResponse)
 async def handle_tally_webhook(
+    session: Session,
     payload: TallySubmission,
-    background_tasks: BackgroundTasks,
 ):
     """
     Handle Tally form submission webhook.
@@ -86,139 +90,48 @@ async def handle_tally_webhook(
     if not email:
         raise HTTPException(status_code=400, detail="Email field required")
 
-    # Queue the video generation pipeline
-    background_tasks.add_task(
-        run_video_pipeline,
-        email=email,
-        context=context,
+    # Queue the video generation pipeline; a worker process picks it up.
+    # Tally retries deliveries, so the event id doubles as a dedupe key.
+    job = await enqueue_job(
+        session,
+        kind="video_pipeline",
+        payload={"email": email, "context": context},
+        dedupe_key=f"tally:{payload.eventId}",
     )
 
     return TallyWebhookResponse(
         status="accepted",
         message="Video generation queued",
+        job_id=job.id,
     )
 
 
-async def run_video_pipeline(email: str, context: dict):
+# ---------- Replicate Webhook ----------
+
+@router.post("/replicate")
+async def handle_replicate_webhook(request: Request):
     """
-    Background task: Full video generation pipeline.
-
-    1. Get or create client
-    2. Create project
-    3. Generate script (LLM)
-    4. Generate image prompts (LLM)
-    5. Generate images (Replicate)
-    6. Generate voiceover (ElevenLabs)
-    7. Assemble video (FFmpeg)
-    8. Create video record
-    9. Notify (TODO)
+    Receive completed Replicate predictions.
+
+    Set REPLICATE_WEBHOOK_URL to this route's public URL to enable it;
+    waiting image generations resolve without polling.
     """
-    from services.llm import generate_script, generate_image_prompts
-    from services.images import generate_images_parallel
-    from services.voice import generate_voiceover, script_to_voiceover_text
-    from services.video import assemble_video_simple
-
-    async with get_session_context() as session:
-        # 1. Get or create client
-        stmt = select(Client).where(Client.email == email)
-        result = await session.execute(stmt)
-        client = result.scalar_one_or_none()
-
-        if not client:
-            client = Client(
-                name=context.get("business_name", "Unknown"),
-                email=email,
-                package="kickstart",
-            )
-            session.add(client)
-            await session.flush()
-
-        # 2. Create project
-        project = Project(
-            client_id=client.id,
-            name=f"Auto: {context.get('topic', 'Video')}",
-            status="in_progress",
-        )
-        session.add(project)
-        await session.flush()
-
-        # 3. Create video record (status: scripting)
-        video = Video(
-            project_id=project.id,
-            title=context.get("topic", "Generated Video"),
-            status="scripting",
-        )
-        session.add(video)
-        await session.flush()
-
-        try:
-            # 4. Generate script
-            script = await generate_script(
-                business_name=context.get("business_name", ""),
-                what_they_sell=context.get("what_they_sell", ""),
-                target_customer=context.get("target_customer", ""),
-                what_makes_different=context.get("what_makes_different", ""),
-                tone=context.get("tone", "friendly"),
-                language=context.get("language", "EN"),
-                topic=context.get("topic"),
-            )
-            video.script = script
-            video.status = "generating"
-            await session.flush()
-
-            # 5. Generate image prompts
-            prompts_data = await generate_image_prompts(
-                script=script,
-                industry=context.get("what_they_sell", "business"),
-            )
-            prompts = [p["prompt"] for p in prompts_data]
-
-            # 6. Generate images
-            image_urls = await generate_images_parallel(prompts)
-
-            # 7. Generate voiceover
-            vo_text = script_to_voiceover_text(script)
-            audio_bytes = await generate_voiceover(
-                text=vo_text,
-                language=context.get("language", "EN"),
-            )
-
-            # Save audio to temp file and get URL
-            # (In production, upload to cloud storage)
-            import tempfile
-            from pathlib import Path
-
-            audio_path = Path(tempfile.mktemp(suffix=".mp3"))
-            audio_path.write_bytes(audio_bytes)
-            audio_url = f"file://{audio_path}"  # Local file URL
-
-            # 8. Assemble video
-            video.status = "rendering"
-            await session.flush()
-
-            output_path = await assemble_video_simple(
-                image_urls=image_urls,
-                audio_url=audio_url,
-                output_format="vertical",
-            )
-
-            # 9. Update video record
-            video.status = "draft"
-            video.formats = {"vertical": str(output_path)}
-            # TODO: Calculate actual cost
-            video.cost_cents = 30  # ~$0.30 estimate
-
-            # Update project status
-            project.status = "review"
-
-        except Exception as e:
-            # Mark as failed
-            video.status = "scripting"  # Reset to allow retry
-            video.approval_note = f"Generation failed: {str(e)}"
-            project.status = "draft"
-            raise
-
-        # TODO: Send notification to Jeroen
+    body = await request.body()
+    if not verify_webhook_signature(
+        body,
+        request.headers.get("webhook-id", ""),
+        request.headers.get("webhook-timestamp", ""),
+        request.headers.get("webhook-signature", ""),
+    ):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    prediction = await request.json()
+    if "id" not in prediction:
+        raise HTTPException(status_code=400, detail="Prediction id required")
+
+    await store_webhook_prediction(prediction)
+
+    return {"status": "received", "prediction_id": prediction["id"]}
 
 
 # ---------- Stripe Webhook ----------
@@ -0,0 +1,265 @@
+"""Persistent, content-addressed caches for paid provider results.
+
+Entries live in SQLite under settings.cache_dir so they survive restarts and
+are shared by every web and worker process on the host. Keys are hashes of
+everything that determines the provider's output.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Optional
+
+from config import get_settings
+
+settings = get_settings()
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable SHA-256 over the JSON encoding of the given parts."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite key/value store with a TTL and least-recently-used eviction by count."""
+
+    def __init__(self, name: str, ttl_seconds: int, max_entries: int):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._path = Path(settings.cache_dir) / f"{name}.sqlite3"
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=10)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_entries_accessed_at"
+                " ON entries (accessed_at)"
+            )
+            self._ready = True
+        return conn
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE created_at <= ?", (now - self.ttl_seconds,)
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+
+def _link_or_copy(source: Path, dest: Path) -> None:
+    """Give dest its own name for source's data; copies across filesystems."""
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(source, dest)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # Another filesystem, or no hard links
+        shutil.copyfile(source, dest)
+
+
+class BlobCache:
+    """
+    Files on disk keyed by content hash, evicted least-recently-used by total size.
+
+    Hits are served straight from the filesystem; a small SQLite index tracks
+    sizes and access times so eviction never has to walk the directory.
+
+    Any process may evict an entry while another still needs the file, so
+    callers that read it later pass dest and get their own hard link (or
+    copy) that eviction doesn't touch.
+    """
+
+    def __init__(self, name: str, max_bytes: int, suffix: str = ""):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._root = Path(settings.cache_dir) / name
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self._root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._root / "index.sqlite3", timeout=10)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                " key TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_blobs_accessed_at ON blobs (accessed_at)"
+            )
+            self._ready = True
+        return conn
+
+    def path_for(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}{self.suffix}"
+
+    def _get(self, key: str, dest: Optional[Path]) -> Optional[Path]:
+        path = self.path_for(key)
+        with closing(self._connect()) as conn, conn:
+            if not path.exists():
+                conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE blobs SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        if dest is None:
+            return path
+        try:
+            _link_or_copy(path, dest)
+        except FileNotFoundError:
+            # Evicted by another process since the lookup
+            return None
+        return dest
+
+    def _staging_path(self, path: Path) -> Path:
+        # Unique per write: threads in one process can store the same key at once
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+    def _record(self, key: str, size: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO blobs (key, size, accessed_at)"
+                " VALUES (?, ?, ?)",
+                (key, size, time.time()),
+            )
+            self._evict(conn, keep=key)
+
+    def _put(self, key: str, data: bytes, dest: Optional[Path]) -> Path:
+        path = self.path_for(key)
+        # Write then rename so readers never see a partial file
+        tmp = self._staging_path(path)
+        tmp.write_bytes(data)
+        return self._commit(key, tmp, path, dest)
+
+    def _put_file(self, key: str, source: Path, dest: Optional[Path]) -> Path:
+        path = self.path_for(key)
+        tmp = self._staging_path(path)
+        shutil.move(source, tmp)
+        return self._commit(key, tmp, path, dest)
+
+    def _commit(self, key: str, tmp: Path, path: Path, dest: Optional[Path]) -> Path:
+        size = tmp.stat().st_size
+        if dest is not None:
+            # Before the rename: once visible, another process may evict it
+            _link_or_copy(tmp, dest)
+        tmp.replace(path)
+        self._record(key, size)
+        return path if dest is None else dest
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM blobs WHERE key != ? ORDER BY accessed_at", (keep,)
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.path_for(key).unlink(missing_ok=True)
+            conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+            total -= size
+
+    async def get(self, key: str, dest: Optional[Path] = None) -> Optional[Path]:
+        """
+        Return the cached file for a key, or None on a miss.
+
+        With dest, the file is linked there and dest is returned.
+        """
+        return await asyncio.to_thread(self._get, key, dest)
+
+    async def put(self, key: str, data: bytes, dest: Optional[Path] = None) -> Path:
+        """Store bytes under a key; returns the cached file, or dest if given."""
+        return await asyncio.to_thread(self._put, key, data, dest)
+
+    async def put_file(
+        self, key: str, source: Path, dest: Optional[Path] = None
+    ) -> Path:
+        """Move a finished file into the cache; returns its path, or dest if given."""
+        return await asyncio.to_thread(self._put_file, key, Path(source), dest)
+
+
+llm_cache = ResponseCache(
+    "llm",
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    max_entries=settings.llm_cache_max_entries,
+)
+
+image_cache = ResponseCache(
+    "images",
+    ttl_seconds=settings.image_cache_ttl_seconds,
+    max_entries=settings.image_cache_max_entries,
+)
+
+media_probe_cache = ResponseCache(
+    "media_probe",
+    ttl_seconds=settings.media_probe_cache_ttl_seconds,
+    max_entries=settings.media_probe_cache_max_entries,
+)
+
+voice_cache = BlobCache(
+    "voice",
+    max_bytes=settings.voice_cache_max_bytes,
+    suffix=".mp3",
+)
+
+segment_cache = BlobCache(
+    "segments",
+    max_bytes=settings.segment_cache_max_bytes,
+    suffix=".mp4",
+)
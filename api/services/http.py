@@ -0,0 +1,80 @@
+"""Shared, pooled HTTP clients for external providers.
+
+One httpx.AsyncClient per provider keeps TLS connections alive across calls
+(prompts, prediction polls, downloads) instead of handshaking every time.
+Clients are created at startup (FastAPI lifespan / worker start) and closed
+at shutdown; `get_http_client` also creates them lazily for scripts.
+"""
+
+import importlib.util
+import logging
+
+import httpx
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# HTTP/2 needs the optional `h2` package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Used for any provider without an entry in settings.provider_http
+DEFAULT_PROVIDER_HTTP = {
+    "timeout": 30.0,
+    "connect_timeout": 10.0,
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 30.0,
+}
+
+
+class ProviderClients:
+    """Registry of one pooled AsyncClient per provider."""
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def _build(self, provider: str) -> httpx.AsyncClient:
+        options = {**DEFAULT_PROVIDER_HTTP, **settings.provider_http.get(provider, {})}
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE and bool(options.get("http2", True)),
+            timeout=httpx.Timeout(
+                options["timeout"], connect=options["connect_timeout"]
+            ),
+            limits=httpx.Limits(
+                max_connections=int(options["max_connections"]),
+                max_keepalive_connections=int(options["max_keepalive_connections"]),
+                keepalive_expiry=options["keepalive_expiry"],
+            ),
+            follow_redirects=True,
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._build(provider)
+            self._clients[provider] = client
+        return client
+
+    def start(self) -> None:
+        """Create clients for every configured provider up front."""
+        for provider in settings.provider_http:
+            self.get(provider)
+        logger.info(
+            f"HTTP clients ready for {', '.join(sorted(self._clients))} "
+            f"(http2={'on' if HTTP2_AVAILABLE else 'off'})"
+        )
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+provider_clients = ProviderClients()
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """Shared client for a provider: anthropic, replicate, elevenlabs or downloads."""
+    return provider_clients.get(provider)
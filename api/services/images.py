@@ -1,89 +1,171 @@
-"""Image generation service using Replicate (Flux)."""
+"""Image generation service using Replicate (Flux).
+
+Generated images are copied into storage and cached by prompt, aspect
+ratio, model and seed. Seeds are derived from the prompt, so re-running a
+video with the same prompts reuses the stored images instead of paying for
+new ones; pass variation=True to get a fresh image.
+"""
 
 import asyncio
+import hashlib
+import random
 from typing import Optional
 
-import httpx
+from pydantic import BaseModel
 
 from config import get_settings
+from services.cache import cache_key, image_cache
+from services.http import get_http_client
+from services.replicate import run_prediction
+from services.storage import storage
 
 settings = get_settings()
 
+FLUX_MODEL = "black-forest-labs/flux-schnell"
+MAX_SEED = 2**31 - 1
+
+
+class StoredImage(BaseModel):
+    """A generated image copied into our storage."""
+
+    key: str  # Storage key, content-addressed
+    sha256: str
+    prompt: str
+    seed: int
+    source_url: str  # Replicate delivery URL; expires, kept for reference
+
+    def asset_meta(self, scene: int) -> dict:
+        return {
+            "scene": scene,
+            "prompt": self.prompt,
+            "seed": self.seed,
+            "sha256": self.sha256,
+            "source_url": self.source_url,
+        }
+
 
 async def generate_image(
     prompt: str,
     aspect_ratio: str = "9:16",
     num_outputs: int = 1,
+    seed: Optional[int] = None,
 ) -> list[str]:
     """
     Generate an image using Replicate's Flux model.
 
-    Returns a list of image URLs.
+    Returns a list of image URLs. Completion arrives via webhook or
+    adaptive polling, see services.replicate. The URLs expire; use
+    generate_stored_image to keep the result.
     """
     if not settings.replicate_api_token:
         raise ValueError("REPLICATE_API_TOKEN not configured")
 
-    async with httpx.AsyncClient() as client:
-        # Start prediction
-        response = await client.post(
-            "https://api.replicate.com/v1/predictions",
-            headers={
-                "Authorization": f"Token {settings.replicate_api_token}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "version": "black-forest-labs/flux-schnell",
-                "input": {
-                    "prompt": prompt,
-                    "aspect_ratio": aspect_ratio,
-                    "num_outputs": num_outputs,
-                    "output_format": "png",
-                },
-            },
-            timeout=30.0,
-        )
-        response.raise_for_status()
-        prediction = response.json()
-
-        # Poll for completion
-        prediction_url = prediction["urls"]["get"]
-        max_attempts = 60  # 60 seconds max wait
-        for _ in range(max_attempts):
-            response = await client.get(
-                prediction_url,
-                headers={"Authorization": f"Token {settings.replicate_api_token}"},
-                timeout=10.0,
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            if result["status"] == "succeeded":
-                return result["output"]
-            elif result["status"] == "failed":
-                raise RuntimeError(f"Image generation failed: {result.get('error')}")
-
-            await asyncio.sleep(1)
-
-        raise TimeoutError("Image generation timed out")
+    input = {
+        "prompt": prompt,
+        "aspect_ratio": aspect_ratio,
+        "num_outputs": num_outputs,
+        "output_format": "png",
+    }
+    if seed is not None:
+        input["seed"] = seed
+
+    result = await run_prediction(FLUX_MODEL, input)
+
+    if result["status"] != "succeeded":
+        raise RuntimeError(f"Image generation failed: {result.get('error')}")
+    return result["output"]
+
+
+async def store_image_url(url: str) -> tuple[str, str]:
+    """
+    Fetch an image once and store it under its content hash.
+
+    Returns (storage key, sha256). Identical images share one object.
+    """
+    response = await get_http_client("downloads").get(url)
+    response.raise_for_status()
+    data = response.content
+
+    digest = hashlib.sha256(data).hexdigest()
+    key = f"images/{digest[:2]}/{digest}.png"
+    if not await storage.exists(key):
+        await storage.put_bytes(key, data, content_type="image/png")
+    return key, digest
+
+
+def seed_for_prompt(prompt: str, aspect_ratio: str) -> int:
+    """Deterministic seed, so the same prompt maps to the same cache entry."""
+    return int(cache_key("seed", prompt, aspect_ratio)[:8], 16) % MAX_SEED
+
+
+def _image_cache_key(prompt: str, aspect_ratio: str, seed: int) -> str:
+    return cache_key("image", FLUX_MODEL, prompt, aspect_ratio, seed)
+
+
+async def _cached_image(key: str) -> Optional[StoredImage]:
+    cached = await image_cache.get(key)
+    if cached is None:
+        return None
+    image = StoredImage.model_validate_json(cached)
+    # The stored object may have been deleted since it was cached
+    return image if await storage.exists(image.key) else None
+
+
+async def generate_stored_image(
+    prompt: str,
+    aspect_ratio: str = "9:16",
+    seed: Optional[int] = None,
+    variation: bool = False,
+) -> StoredImage:
+    """
+    Generate one image and copy it into storage straight away.
+
+    Without a seed, one is derived from the prompt and a cached image for
+    the same prompt, aspect ratio, model and seed is returned without
+    calling Replicate. variation=True picks a random seed and skips the
+    cache lookup.
+    """
+    if variation:
+        seed = random.randint(0, MAX_SEED)
+    elif seed is None:
+        seed = seed_for_prompt(prompt, aspect_ratio)
+
+    key = _image_cache_key(prompt, aspect_ratio, seed)
+    if not variation:
+        cached = await _cached_image(key)
+        if cached:
+            return cached
+
+    urls = await generate_image(prompt, aspect_ratio, seed=seed)
+    stored_key, digest = await store_image_url(urls[0])
+    image = StoredImage(
+        key=stored_key, sha256=digest, prompt=prompt, seed=seed, source_url=urls[0]
+    )
+    await image_cache.set(key, image.model_dump_json())
+    return image
 
 
 async def generate_images_parallel(
     prompts: list[str],
     aspect_ratio: str = "9:16",
-) -> list[str]:
+    variation: bool = False,
+) -> list[StoredImage]:
     """
     Generate multiple images in parallel.
 
-    Returns a list of image URLs in the same order as prompts.
+    Cache hits return immediately; only the misses go to Replicate.
+    Returns the stored images in the same order as prompts.
     """
-    tasks = [generate_image(prompt, aspect_ratio) for prompt in prompts]
+    tasks = [
+        generate_stored_image(prompt, aspect_ratio, variation=variation)
+        for prompt in prompts
+    ]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
-    urls = []
+    images = []
     for i, result in enumerate(results):
         if isinstance(result, Exception):
             raise RuntimeError(f"Failed to generate image {i}: {result}")
-        # Each result is a list, take the first image
-        urls.append(result[0] if result else None)
+        images.append(result)
 
-    return urls
+    return images
@@ -0,0 +1,290 @@
+"""Persistent job queue backed by the jobs table.
+
+The web tier only enqueues; worker processes (see worker.py) claim jobs with a
+time-limited lease, renew it while running, and mark the job done or failed.
+A job whose lease expires (worker crashed or was restarted) becomes claimable
+again, so interrupted work is resumed rather than lost; if that was its last
+attempt, the reaper marks it failed instead.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from database import get_session_context
+from models.db import Job, Project, Video
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _claimable(now: datetime):
+    """Filter for jobs that are waiting, or running under an expired lease."""
+    return or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.lease_expires_at < now),
+    )
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    kind: str,
+    payload: dict,
+    dedupe_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+    video_id: Optional[str] = None,
+) -> Job:
+    """
+    Add a job to the queue in the caller's transaction.
+
+    If a dedupe_key is given and a job with that key already exists, the
+    existing job is returned instead of queueing a duplicate.
+    """
+    if dedupe_key:
+        existing = await _job_by_dedupe_key(session, dedupe_key)
+        if existing:
+            return existing
+
+    job = Job(
+        kind=kind,
+        payload=payload,
+        dedupe_key=dedupe_key,
+        max_attempts=max_attempts or settings.job_max_attempts,
+        video_id=video_id,
+    )
+    try:
+        # A savepoint, so losing a dedupe race keeps the caller's transaction
+        async with session.begin_nested():
+            session.add(job)
+    except IntegrityError:
+        if not dedupe_key:
+            raise
+        # A concurrent delivery (e.g. a Tally retry) inserted the same key
+        # between the check above and this insert
+        existing = await _job_by_dedupe_key(session, dedupe_key)
+        if not existing:
+            raise
+        return existing
+    return job
+
+
+async def _job_by_dedupe_key(session: AsyncSession, dedupe_key: str) -> Optional[Job]:
+    result = await session.execute(select(Job).where(Job.dedupe_key == dedupe_key))
+    return result.scalar_one_or_none()
+
+
+async def claim_job(worker_id: str, kinds: Optional[list[str]] = None) -> Optional[Job]:
+    """
+    Claim the oldest claimable job for this worker.
+
+    Uses a conditional UPDATE so that two workers racing for the same row
+    cannot both win, on SQLite and Postgres alike.
+    """
+    now = datetime.utcnow()
+
+    # Expired leases first (that work was already under way), then due jobs.
+    # Two queries rather than one OR, so each is a search on
+    # ix_jobs_status_run_after / ix_jobs_status instead of a scan over every
+    # finished job of the kind.
+    expired = (
+        select(Job.id)
+        .where(
+            Job.status == "running",
+            Job.lease_expires_at < now,
+            Job.attempts < Job.max_attempts,
+        )
+        .order_by(Job.lease_expires_at)
+        .limit(5)
+    )
+    queued = (
+        select(Job.id)
+        .where(Job.status == "queued", Job.run_after <= now)
+        .order_by(Job.run_after, Job.created_at)
+        .limit(5)
+    )
+    if kinds:
+        expired = expired.where(Job.kind.in_(kinds))
+        queued = queued.where(Job.kind.in_(kinds))
+
+    async with get_session_context() as session:
+        candidates = [
+            *(await session.execute(expired)).scalars(),
+            *(await session.execute(queued)).scalars(),
+        ]
+
+        for job_id in candidates:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id, _claimable(now))
+                .values(
+                    status="running",
+                    lease_owner=worker_id,
+                    lease_expires_at=now
+                    + timedelta(seconds=settings.job_lease_seconds),
+                    attempts=Job.attempts + 1,
+                    updated_at=now,
+                )
+            )
+            if result.rowcount == 1:
+                await session.commit()
+                job = await session.get(Job, job_id)
+                logger.info(
+                    f"Worker {worker_id} claimed job {job_id} "
+                    f"({job.kind}, attempt {job.attempts}/{job.max_attempts})"
+                )
+                return job
+
+    return None
+
+
+async def renew_lease(job_id: str, worker_id: str) -> bool:
+    """Extend the lease on a running job. Returns False if the lease was lost."""
+    now = datetime.utcnow()
+    async with get_session_context() as session:
+        result = await session.execute(
+            update(Job)
+            .where(
+                Job.id == job_id, Job.lease_owner == worker_id, Job.status == "running"
+            )
+            .values(
+                lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds)
+            )
+        )
+        return result.rowcount == 1
+
+
+async def complete_job(job_id: str, worker_id: str) -> None:
+    """Mark a job as succeeded and release its lease."""
+    async with get_session_context() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.lease_owner == worker_id)
+            .values(
+                status="succeeded",
+                lease_owner=None,
+                lease_expires_at=None,
+                last_error=None,
+            )
+        )
+
+
+async def _fail_video(session: AsyncSession, job: Job, note: Optional[str]) -> None:
+    """
+    Record a permanently failed job on its video.
+
+    A failed generation moves the video (and its in-progress project) to
+    "failed"; pipeline checkpoints are kept, so a new job for the video
+    resumes from the last completed stage. Other jobs, such as a final
+    render of an approved video, only leave the note.
+    """
+    if not job.video_id:
+        return
+    video = await session.get(Video, job.video_id)
+    if not video:
+        return
+    if note:
+        video.approval_note = note
+    if job.kind != "video_pipeline":
+        return
+    video.status = "failed"
+    project = await session.get(Project, video.project_id)
+    if project and project.status == "in_progress":
+        project.status = "failed"
+
+
+async def fail_job(job_id: str, worker_id: str, error: str) -> None:
+    """
+    Record a failed attempt.
+
+    The job is re-queued with a linear backoff until max_attempts is reached,
+    after which it and its video are marked failed.
+    """
+    async with get_session_context() as session:
+        job = await session.get(Job, job_id)
+        if not job or job.lease_owner != worker_id:
+            return
+
+        job.last_error = error
+        job.lease_owner = None
+        job.lease_expires_at = None
+
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+            logger.error(f"Job {job_id} failed permanently: {error}")
+            # The pipeline already left a note naming the failed stage
+            await _fail_video(session, job, note=None)
+        else:
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(
+                seconds=settings.job_retry_backoff_seconds * job.attempts
+            )
+            logger.warning(
+                f"Job {job_id} attempt {job.attempts} failed, retrying: {error}"
+            )
+
+
+async def reap_expired_jobs() -> int:
+    """
+    Fail running jobs whose lease expired on their last attempt.
+
+    claim_job skips them (no attempts left), so without this a worker killed
+    mid-job (e.g. OOM during FFmpeg) would leave the job running forever. The
+    video is marked failed with a note like a failed stage leaves. Returns the
+    count.
+    """
+    now = datetime.utcnow()
+    async with get_session_context() as session:
+        stmt = select(Job).where(
+            Job.status == "running",
+            Job.lease_expires_at < now,
+            Job.attempts >= Job.max_attempts,
+        )
+        jobs = (await session.execute(stmt)).scalars().all()
+        for job in jobs:
+            job.status = "failed"
+            job.last_error = (
+                f"Worker {job.lease_owner} stopped responding on the final "
+                f"attempt ({job.attempts}/{job.max_attempts})"
+            )
+            job.lease_owner = None
+            job.lease_expires_at = None
+            logger.error(f"Job {job.id} failed permanently: {job.last_error}")
+
+            await _fail_video(session, job, f"Generation failed: {job.last_error}")
+    return len(jobs)
+
+
+async def run_reaper(interval_seconds: float) -> None:
+    """Reap abandoned final attempts every `interval_seconds` until cancelled."""
+    while True:
+        try:
+            await reap_expired_jobs()
+        except Exception as e:
+            logger.warning(f"Job reaper failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+async def release_job(job_id: str, worker_id: str) -> None:
+    """
+    Hand a job back to the queue without counting the attempt.
+
+    Used on graceful worker shutdown so the next worker picks it up right away.
+    """
+    async with get_session_context() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.lease_owner == worker_id)
+            .values(
+                status="queued",
+                lease_owner=None,
+                lease_expires_at=None,
+                attempts=Job.attempts - 1,
+                run_after=datetime.utcnow(),
+            )
+        )
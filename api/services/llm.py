@@ -3,12 +3,15 @@
 import json
 from typing import Optional
 
-import httpx
-
 from config import get_settings
+from services.cache import cache_key, llm_cache
+from services.http import get_http_client
+from services.scheduler import provider_slot
 
 settings = get_settings()
 
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+
 VIDEO_STYLE_DESCRIPTIONS = {
     "presenter": "Direct presenter to camera. Trust-building, personal connection. Good for services and coaching.",
     "product": "Fast cuts, bold visuals, product-focused shots. Built for e-commerce and physical products.",
@@ -103,6 +106,57 @@ Return ONLY valid JSON with no additional text:
 }}"""
 
 
+async def _call_claude(prompt: str, max_tokens: int) -> str:
+    """Send a single-turn prompt to Claude and return the text response."""
+    client = get_http_client("anthropic")
+    async with provider_slot("anthropic"):
+        response = await client.post(
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "x-api-key": settings.anthropic_api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json={
+                "model": CLAUDE_MODEL,
+                "max_tokens": max_tokens,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        )
+    response.raise_for_status()
+
+    result = response.json()
+    return result["content"][0]["text"]
+
+
+async def _claude_json(
+    prompt: str, max_tokens: int, what: str, regenerate: bool
+) -> dict:
+    """
+    Get a JSON response from Claude, served from the LLM cache when possible.
+
+    The cache key covers the rendered prompt, model and max_tokens, so any
+    change to the inputs or templates misses. Only responses that parse are
+    cached. Pass regenerate=True to skip the lookup and overwrite the entry.
+    """
+    key = cache_key(CLAUDE_MODEL, max_tokens, prompt)
+    if not regenerate:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+    content = await _call_claude(prompt, max_tokens=max_tokens)
+
+    # Parse JSON from response
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse {what} JSON: {e}\nContent: {content}")
+
+    await llm_cache.set(key, content)
+    return data
+
+
 async def generate_script(
     business_name: str,
     what_they_sell: str,
@@ -113,11 +167,13 @@ async def generate_script(
     topic: Optional[str] = None,
     video_style: str = "voiceover",
     video_length: str = "15s",
+    regenerate: bool = False,
 ) -> dict:
     """
     Generate a video script using Claude API.
 
-    Returns the script as a structured dict.
+    Returns the script as a structured dict. Identical inputs are served from
+    the LLM cache unless regenerate=True.
     """
     if not settings.anthropic_api_key:
         raise ValueError("ANTHROPIC_API_KEY not configured")
@@ -142,42 +198,22 @@ async def generate_script(
         target_duration=length_spec["duration"],
     )
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": settings.anthropic_api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json",
-            },
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "max_tokens": 1000,
-                "messages": [{"role": "user", "content": prompt}],
-            },
-            timeout=60.0,
-        )
-        response.raise_for_status()
-
-    result = response.json()
-    content = result["content"][0]["text"]
-
-    # Parse JSON from response
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse script JSON: {e}\nContent: {content}")
+    return await _claude_json(
+        prompt, max_tokens=1000, what="script", regenerate=regenerate
+    )
 
 
 async def generate_image_prompts(
     script: dict,
     industry: str = "general business",
     video_style: str = "voiceover",
+    regenerate: bool = False,
 ) -> list[dict]:
     """
     Generate image prompts for each scene in a script.
 
-    Returns a list of {scene, prompt} dicts.
+    Returns a list of {scene, prompt} dicts. Identical inputs are served from
+    the LLM cache unless regenerate=True.
     """
     if not settings.anthropic_api_key:
         raise ValueError("ANTHROPIC_API_KEY not configured")
@@ -193,29 +229,7 @@ async def generate_image_prompts(
         visual_direction=visual_direction,
     )
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": settings.anthropic_api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json",
-            },
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "max_tokens": 2000,
-                "messages": [{"role": "user", "content": prompt}],
-            },
-            timeout=60.0,
-        )
-        response.raise_for_status()
-
-    result = response.json()
-    content = result["content"][0]["text"]
-
-    # Parse JSON from response
-    try:
-        data = json.loads(content)
-        return data.get("prompts", [])
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse image prompts JSON: {e}\nContent: {content}")
+    data = await _claude_json(
+        prompt, max_tokens=2000, what="image prompts", regenerate=regenerate
+    )
+    return data.get("prompts", [])
@@ -0,0 +1,112 @@
+"""Async media probing shared by rendering, the pipeline and validation.
+
+ffprobe runs as an async subprocess so probing never blocks the event loop.
+Results are memoized by the SHA-256 of the file content, in process and in
+the persistent probe cache, so the same asset is only probed once.
+"""
+
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from services.cache import media_probe_cache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MEMO_MAX_ENTRIES = 4096
+
+_memo: dict[str, "MediaInfo"] = {}
+
+
+class MediaInfo(BaseModel):
+    """What ffprobe reports about an image, audio or video file."""
+
+    duration: float = 0.0
+    format_name: Optional[str] = None
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    @property
+    def codec(self) -> Optional[str]:
+        """The primary codec: video if present, else audio."""
+        return self.video_codec or self.audio_codec
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def file_sha256(path: Path) -> str:
+    """Content hash of a file, computed off the event loop."""
+    return await asyncio.to_thread(_file_sha256, Path(path))
+
+
+async def _run_ffprobe(path: Path) -> MediaInfo:
+    process = await asyncio.create_subprocess_exec(
+        "ffprobe",
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        str(path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode != 0 or not stdout:
+        return MediaInfo()
+
+    data = json.loads(stdout)
+    fmt = data.get("format", {})
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+    return MediaInfo(
+        duration=float(fmt.get("duration") or 0.0),
+        format_name=fmt.get("format_name"),
+        video_codec=video.get("codec_name"),
+        audio_codec=audio.get("codec_name"),
+        sample_rate=int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+        channels=audio.get("channels"),
+        width=video.get("width"),
+        height=video.get("height"),
+    )
+
+
+async def probe_media(path: Path) -> MediaInfo:
+    """Probe a local media file, memoized by content hash."""
+    digest = await file_sha256(path)
+    if digest in _memo:
+        return _memo[digest]
+
+    cached = await media_probe_cache.get(digest)
+    if cached is not None:
+        info = MediaInfo.model_validate_json(cached)
+    else:
+        info = await _run_ffprobe(Path(path))
+        # Don't remember failed probes; the file may have been incomplete
+        if info.format_name:
+            await media_probe_cache.set(digest, info.model_dump_json())
+
+    if info.format_name:
+        if len(_memo) >= MEMO_MAX_ENTRIES:
+            _memo.pop(next(iter(_memo)))
+        _memo[digest] = info
+    return info
+
+
+async def probe_duration(path: Path) -> float:
+    """Return a media file's duration in seconds (0.0 if it cannot be read)."""
+    return (await probe_media(path)).duration
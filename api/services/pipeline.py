@@ -0,0 +1,588 @@
+"""Video generation pipeline, executed by the worker pool."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+
+from sqlalchemy import select, update
+
+from config import get_settings
+from database import get_session_context
+from models.db import Asset, Client, Job, Project, Video
+from services.storage import is_storage_key, storage, video_key
+from services.workspace import workspace_manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_stage_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+@asynccontextmanager
+async def stage_slot(stage: str):
+    """Limit how many pipelines run a given stage at once in this process."""
+    if stage not in _stage_semaphores:
+        limit = settings.pipeline_stage_concurrency.get(stage, 1)
+        _stage_semaphores[stage] = asyncio.Semaphore(max(1, limit))
+
+    async with _stage_semaphores[stage]:
+        yield
+
+
+async def _get_or_create_video(job: Job) -> str:
+    """
+    Create the client, project and video rows for a job, once.
+
+    The video id is stored on the job in the same transaction, so a resumed
+    run picks up the same records instead of creating duplicates.
+    """
+    if job.video_id:
+        return job.video_id
+
+    email = job.payload["email"]
+    context = job.payload.get("context", {})
+
+    async with get_session_context() as session:
+        # 1. Get or create client
+        stmt = select(Client).where(Client.email == email)
+        result = await session.execute(stmt)
+        client = result.scalar_one_or_none()
+
+        if not client:
+            client = Client(
+                name=context.get("business_name", "Unknown"),
+                email=email,
+                package="kickstart",
+            )
+            session.add(client)
+            await session.flush()
+
+        # 2. Create project
+        project = Project(
+            client_id=client.id,
+            name=f"Auto: {context.get('topic', 'Video')}",
+            status="in_progress",
+        )
+        session.add(project)
+        await session.flush()
+
+        # 3. Create video record (status: scripting)
+        video = Video(
+            project_id=project.id,
+            client_id=client.id,
+            title=context.get("topic", "Generated Video"),
+            status="scripting",
+        )
+        session.add(video)
+        await session.flush()
+
+        # Same transaction: a crash can't leave rows the retry won't find
+        await session.execute(
+            update(Job).where(Job.id == job.id).values(video_id=video.id)
+        )
+
+    job.video_id = video.id
+    return video.id
+
+
+PIPELINE_STAGES = ("script", "image_prompts", "images", "voiceover", "render")
+
+# Stage -> stages whose output it needs. The voiceover only needs the script,
+# so it runs alongside image prompts and images; render waits for both.
+STAGE_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "script": (),
+    "image_prompts": ("script",),
+    "images": ("image_prompts",),
+    "voiceover": ("script",),
+    "render": ("images", "voiceover"),
+}
+
+
+async def load_checkpoint(video_id: str) -> dict:
+    """
+    Collect the saved output of every completed stage for a video.
+
+    Stage outputs live where the rest of the app expects them: the script and
+    rendered formats on the Video, images and voiceover as Asset rows, and the
+    image prompts in Video.pipeline_state.
+    """
+    async with get_session_context() as session:
+        video = await session.get(Video, video_id)
+        stmt = select(Asset).where(Asset.video_id == video_id)
+        assets = (await session.execute(stmt)).scalars().all()
+
+    state = video.pipeline_state or {}
+    images = {
+        a.meta["scene"]: a.url
+        for a in assets
+        if a.type == "image" and a.meta and "scene" in a.meta
+    }
+    audio = next((a for a in assets if a.type == "audio"), None)
+
+    return {
+        "script": video.script,
+        "image_prompts": state.get("image_prompts"),
+        "image_scenes": state.get("image_scenes"),
+        "images": images,
+        "voiceover": audio.url if audio else None,
+        "scene_durations": (audio.meta or {}).get("scene_durations") if audio else None,
+        "render": video.formats,
+    }
+
+
+def first_incomplete_stage(checkpoint: dict) -> str | None:
+    """Return the first stage without a saved result, or None if all are done."""
+    for stage in PIPELINE_STAGES:
+        if stage == "images":
+            prompts = checkpoint["image_prompts"] or []
+            if not prompts or len(checkpoint["images"]) < len(prompts):
+                return stage
+        elif not checkpoint[stage]:
+            return stage
+    return None
+
+
+async def _update_video(video_id: str, **fields) -> None:
+    async with get_session_context() as session:
+        video = await session.get(Video, video_id)
+        for field, value in fields.items():
+            setattr(video, field, value)
+
+
+async def _update_pipeline_state(video_id: str, **fields) -> None:
+    async with get_session_context() as session:
+        video = await session.get(Video, video_id)
+        video.pipeline_state = {**(video.pipeline_state or {}), **fields}
+
+
+async def _add_asset(video_id: str, type: str, url: str, meta: dict) -> None:
+    # client_id is copied from the video in the INSERT itself, no extra round trip
+    client_id = select(Video.client_id).where(Video.id == video_id).scalar_subquery()
+    async with get_session_context() as session:
+        session.add(
+            Asset(video_id=video_id, client_id=client_id, type=type, url=url, meta=meta)
+        )
+
+
+class StageFailed(Exception):
+    """A pipeline stage raised; carries the stage name for checkpoint notes."""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class _DependencyFailed(Exception):
+    """A stage skipped because a stage it depends on failed."""
+
+
+async def run_stage_graph(
+    stages: dict[str, Callable[[], Awaitable[None]]],
+    dependencies: dict[str, tuple[str, ...]] = STAGE_DEPENDENCIES,
+) -> None:
+    """
+    Run stages as a dependency graph.
+
+    Each stage starts as soon as all of its dependencies have finished, so
+    independent branches overlap. A failure skips only the stages downstream
+    of it; independent branches (e.g. the voiceover while images fail) run to
+    completion and checkpoint, so a retry does not pay for them again. Once
+    everything has settled, the first failure is raised as StageFailed.
+    """
+    tasks: dict[str, asyncio.Task] = {}
+    failures: list[StageFailed] = []
+
+    async def run(name: str) -> None:
+        for dep in dependencies[name]:
+            try:
+                await tasks[dep]
+            except (StageFailed, _DependencyFailed):
+                raise _DependencyFailed(name) from None
+        try:
+            await stages[name]()
+        except Exception as e:
+            failure = StageFailed(name, e)
+            failures.append(failure)
+            raise failure from e
+
+    for name in stages:
+        tasks[name] = asyncio.create_task(run(name))
+
+    try:
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    finally:
+        # Only reached with tasks still running if this call was cancelled
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    if failures:
+        raise failures[0]
+
+
+async def store_remote_images(video_id: str, checkpoint: dict) -> None:
+    """
+    Copy scene images still pointing at provider URLs into storage.
+
+    Videos generated before images were stored on creation reference
+    Replicate delivery URLs, which expire. Each is fetched once and its
+    Asset row repointed at the storage key.
+    """
+    from services.images import store_image_url
+
+    remote = {
+        scene: url
+        for scene, url in checkpoint["images"].items()
+        if not is_storage_key(url)
+    }
+    if not remote:
+        return
+
+    results = await asyncio.gather(*(store_image_url(url) for url in remote.values()))
+    stored = dict(zip(remote, results))
+    async with get_session_context() as session:
+        stmt = select(Asset).where(Asset.video_id == video_id, Asset.type == "image")
+        for asset in (await session.execute(stmt)).scalars():
+            scene = (asset.meta or {}).get("scene")
+            if scene in remote and asset.url == remote[scene]:
+                key, digest = stored[scene]
+                asset.url = key
+                asset.meta = {
+                    **asset.meta,
+                    "sha256": digest,
+                    "source_url": remote[scene],
+                }
+                checkpoint["images"][scene] = key
+
+
+def image_scenes_from_prompts(
+    prompts_data: list[dict], scene_count: int
+) -> list[int]:
+    """
+    The script scene (0-based) each image prompt illustrates.
+
+    Uses the prompt's 1-based "scene" field; a prompt without a usable one
+    falls back to its position.
+    """
+    scenes = []
+    for i, prompt in enumerate(prompts_data):
+        try:
+            scene = int(prompt.get("scene")) - 1
+        except (TypeError, ValueError):
+            scene = -1
+        if not 0 <= scene < max(scene_count, 1):
+            logger.warning(f"Image prompt {i} has no valid scene; using position")
+            scene = i
+        scenes.append(scene)
+    return scenes
+
+
+def timed_images(checkpoint: dict) -> tuple[list[str], list[float] | None]:
+    """
+    The images to render, in scene order, and how long each is held.
+
+    Each image is held for its own scene's narration. Images of silent
+    scenes have nothing to be held for and are left out. Without per-scene
+    durations (single-pass voiceover) the renderer splits the audio evenly.
+    """
+    from services.video import scene_image_durations
+
+    image_count = len(checkpoint["image_prompts"])
+    image_urls = [checkpoint["images"][i] for i in range(image_count)]
+    scene_durations = checkpoint["scene_durations"]
+    if not scene_durations:
+        return image_urls, None
+
+    # Checkpoints saved before image_scenes pair images with scenes by position
+    image_scenes = checkpoint.get("image_scenes") or list(range(image_count))
+    order = sorted(range(image_count), key=lambda i: image_scenes[i])
+    durations = scene_image_durations(
+        [image_scenes[i] for i in order], scene_durations
+    )
+    shown = [(image_urls[i], d) for i, d in zip(order, durations) if d > 0]
+    return [url for url, _ in shown], [d for _, d in shown]
+
+
+async def render_checkpoint(
+    video_id: str, checkpoint: dict, profile: str, priority: int
+) -> dict[str, str]:
+    """
+    Render every configured format from a video's saved images and voiceover.
+
+    settings.render_assembly picks per-scene segments (parallel, cached per
+    scene) or a single FFmpeg pass.
+    """
+    from services.video import assemble_video_formats, assemble_video_segments
+
+    await store_remote_images(video_id, checkpoint)
+    image_urls, durations = timed_images(checkpoint)
+    assemble = (
+        assemble_video_segments
+        if settings.render_assembly == "segments"
+        else assemble_video_formats
+    )
+
+    async with stage_slot("render"):
+        return await assemble(
+            image_urls=image_urls,
+            audio_url=checkpoint["voiceover"],
+            formats=settings.render_formats,
+            scene_durations=durations,
+            label=f"video:{video_id}:{profile}",
+            priority=priority,
+            profile=profile,
+            output_prefix=video_key(video_id, f"renders/{profile}"),
+        )
+
+
+async def run_video_pipeline(job: Job) -> None:
+    """
+    Worker job: Full video generation pipeline.
+
+    1. Get or create client, project and video
+    2. Generate script (LLM)
+    3. Generate image prompts (LLM), then images (Replicate)
+    4. Generate voiceover (ElevenLabs), in parallel with step 3
+    5. Assemble every format once steps 3 and 4 are done
+    6. Notify (TODO)
+
+    Every stage commits its output as soon as it finishes. A retried job
+    reloads those checkpoints and only runs stages without a saved result,
+    so paid results are never regenerated.
+    """
+    from services.images import generate_stored_image
+    from services.llm import generate_image_prompts, generate_script
+    from services.media import probe_duration
+    from services.render_queue import RENDER_PRIORITY_DRAFT
+    from services.video import concat_audio
+    from services.voice import (
+        clip_durations_by_scene,
+        script_to_scene_texts,
+        script_to_voiceover_text,
+        synthesize_scene_voiceovers,
+        synthesize_voiceover,
+    )
+
+    context = job.payload.get("context", {})
+    # "Regenerate" requests bypass the LLM cache
+    regenerate = job.payload.get("regenerate", False)
+    # "Variation" requests get new images for unchanged prompts
+    variation = job.payload.get("variation", False)
+    video_id = await _get_or_create_video(job)
+    checkpoint = await load_checkpoint(video_id)
+    resume_at = first_incomplete_stage(checkpoint)
+
+    if resume_at is None:
+        logger.info(f"Video {video_id} already rendered, nothing to resume")
+        return
+    if resume_at != PIPELINE_STAGES[0]:
+        logger.info(f"Resuming video {video_id} at stage '{resume_at}'")
+
+    async def script_stage() -> None:
+        if checkpoint["script"]:
+            return
+        async with stage_slot("script"):
+            checkpoint["script"] = await generate_script(
+                business_name=context.get("business_name", ""),
+                what_they_sell=context.get("what_they_sell", ""),
+                target_customer=context.get("target_customer", ""),
+                what_makes_different=context.get("what_makes_different", ""),
+                tone=context.get("tone", "friendly"),
+                language=context.get("language", "EN"),
+                topic=context.get("topic"),
+                regenerate=regenerate,
+            )
+        await _update_video(video_id, script=checkpoint["script"], status="generating")
+
+    async def image_prompts_stage() -> None:
+        if checkpoint["image_prompts"]:
+            return
+        async with stage_slot("script"):
+            prompts_data = await generate_image_prompts(
+                script=checkpoint["script"],
+                industry=context.get("what_they_sell", "business"),
+                regenerate=regenerate,
+            )
+        scene_count = len(checkpoint["script"].get("scenes", []))
+        if len(prompts_data) != scene_count:
+            logger.warning(
+                f"Video {video_id}: {len(prompts_data)} image prompts "
+                f"for {scene_count} scenes"
+            )
+        checkpoint["image_prompts"] = [p["prompt"] for p in prompts_data]
+        checkpoint["image_scenes"] = image_scenes_from_prompts(
+            prompts_data, scene_count
+        )
+        await _update_pipeline_state(
+            video_id,
+            image_prompts=checkpoint["image_prompts"],
+            image_scenes=checkpoint["image_scenes"],
+        )
+
+    async def images_stage() -> None:
+        # Only scenes without a saved image
+        prompts = checkpoint["image_prompts"]
+        missing = [i for i in range(len(prompts)) if i not in checkpoint["images"]]
+        if not missing:
+            return
+
+        async def image_for_scene(i: int) -> None:
+            # Copied into storage right away; Replicate's URLs expire
+            image = await generate_stored_image(prompts[i], variation=variation)
+            checkpoint["images"][i] = image.key
+            await _add_asset(video_id, "image", image.key, image.asset_meta(i))
+
+        async with stage_slot("images"):
+            results = await asyncio.gather(
+                *(image_for_scene(i) for i in missing), return_exceptions=True
+            )
+        for i, result in zip(missing, results):
+            if isinstance(result, Exception):
+                raise RuntimeError(f"Failed to generate image {i}: {result}")
+
+    async def voiceover_stage() -> None:
+        if checkpoint["voiceover"]:
+            return
+        language = context.get("language", "EN")
+        scene_durations = None
+
+        # Clips are linked into the workspace since the voice cache may evict
+        # them mid-stage; the result goes to storage so a failed render, or a
+        # render on another host, can reuse it
+        async with workspace_manager.workspace(f"voiceover:{video_id}") as workspace:
+            if settings.voiceover_mode == "per_scene":
+                scene_texts = script_to_scene_texts(checkpoint["script"])
+                texts = [text for _, text in scene_texts]
+                vo_text = " ".join(texts)
+                async with stage_slot("voiceover"):
+                    clips = await synthesize_scene_voiceovers(
+                        texts,
+                        language=language,
+                        regenerate=regenerate,
+                        dest_dir=workspace.path,
+                    )
+                clip_durations = await asyncio.gather(
+                    *(probe_duration(c) for c in clips)
+                )
+                # One entry per script scene; silent scenes are 0
+                scene_durations = clip_durations_by_scene(
+                    scene_texts,
+                    clip_durations,
+                    len(checkpoint["script"].get("scenes", [])),
+                )
+                audio_path = await concat_audio(clips, workspace.file("voiceover.mp3"))
+            else:
+                vo_text = script_to_voiceover_text(checkpoint["script"])
+                async with stage_slot("voiceover"):
+                    audio_path = await synthesize_voiceover(
+                        text=vo_text,
+                        language=language,
+                        regenerate=regenerate,
+                        dest=workspace.file("voiceover.mp3"),
+                    )
+            audio_key = await storage.put_file(
+                video_key(video_id, "voiceover.mp3"),
+                audio_path,
+                content_type="audio/mpeg",
+            )
+
+        checkpoint["voiceover"] = audio_key
+        checkpoint["scene_durations"] = scene_durations
+        await _add_asset(
+            video_id,
+            "audio",
+            checkpoint["voiceover"],
+            {"text": vo_text, "scene_durations": scene_durations},
+        )
+
+    async def render_stage() -> None:
+        await _update_video(video_id, status="rendering")
+
+        # Auto-pipeline drafts render fast and yield to paid-client renders;
+        # approval triggers the final-quality render (run_final_render)
+        outputs = await render_checkpoint(
+            video_id,
+            checkpoint,
+            profile=settings.pipeline_render_profile,
+            priority=RENDER_PRIORITY_DRAFT,
+        )
+
+        async with get_session_context() as session:
+            video = await session.get(Video, video_id)
+            project = await session.get(Project, video.project_id)
+            video.status = "draft"
+            video.formats = outputs
+            video.approval_note = None
+            # TODO: Calculate actual cost
+            video.cost_cents = 30  # ~$0.30 estimate
+            state = {
+                k: v
+                for k, v in (video.pipeline_state or {}).items()
+                if k != "failed_stage"
+            }
+            video.pipeline_state = {
+                **state,
+                "render_profile": settings.pipeline_render_profile,
+            }
+            project.status = "review"
+
+    try:
+        await run_stage_graph(
+            {
+                "script": script_stage,
+                "image_prompts": image_prompts_stage,
+                "images": images_stage,
+                "voiceover": voiceover_stage,
+                "render": render_stage,
+            }
+        )
+    except StageFailed as e:
+        # Keep every checkpoint; the job queue decides whether to retry
+        await _update_video(
+            video_id, approval_note=f"Generation failed at {e.stage}: {e.error}"
+        )
+        await _update_pipeline_state(video_id, failed_stage=e.stage)
+        raise
+
+    # TODO: Send notification to Jeroen
+
+
+async def run_final_render(job: Job) -> None:
+    """
+    Worker job: re-render an approved video with the final-quality profile.
+
+    Reuses the pipeline's saved images and voiceover; only FFmpeg runs.
+    """
+    from services.render_queue import RENDER_PRIORITY_PAID
+
+    video_id = job.payload["video_id"]
+    checkpoint = await load_checkpoint(video_id)
+    if first_incomplete_stage(checkpoint) not in (None, "render"):
+        raise RuntimeError(f"Video {video_id} has no generated assets to render")
+
+    outputs = await render_checkpoint(
+        video_id, checkpoint, profile="final", priority=RENDER_PRIORITY_PAID
+    )
+
+    async with get_session_context() as session:
+        video = await session.get(Video, video_id)
+        video.formats = outputs
+        video.pipeline_state = {
+            **(video.pipeline_state or {}),
+            "render_profile": "final",
+        }
+
+
+def needs_final_render(video: Video) -> bool:
+    """True if the video's current formats are a draft-quality render."""
+    state = video.pipeline_state or {}
+    return state.get("render_profile", "final") != "final"
+
+
+# Job kind -> handler, used by the worker pool
+JOB_HANDLERS = {
+    "video_pipeline": run_video_pipeline,
+    "render_final": run_final_render,
+}
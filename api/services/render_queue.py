@@ -0,0 +1,164 @@
+"""CPU-aware scheduling for FFmpeg renders.
+
+Caps how many encoder threads run at once based on the core count, gives each
+encode a `-threads` budget, and queues the rest by priority so paid-client
+renders go ahead of auto-pipeline drafts. Full renders take
+render_threads_per_job threads; per-scene segments ask for fewer, so more of
+them run side by side. Queue wait and render time are logged per job
+and kept for /metrics.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Lower runs first
+RENDER_PRIORITY_PAID = 0
+RENDER_PRIORITY_DRAFT = 10
+
+
+class RenderSlot:
+    """A granted render: its thread budget and timings."""
+
+    def __init__(
+        self, label: str, priority: int, threads: int, queue_wait_seconds: float
+    ):
+        self.label = label
+        self.priority = priority
+        self.threads = threads
+        self.queue_wait_seconds = queue_wait_seconds
+        self.render_seconds = 0.0
+
+
+class RenderScheduler:
+    """Priority queue in front of a fixed budget of FFmpeg encoder threads."""
+
+    def __init__(self, max_concurrent: int, threads_per_job: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.threads_per_job = max(1, threads_per_job)
+        # Total threads shared by all running encodes
+        self.capacity = self.max_concurrent * self.threads_per_job
+        self._running = 0
+        self._threads_in_use = 0
+        self._waiters: list[tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.recent: deque[dict] = deque(maxlen=50)
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def _grant(self, threads: int) -> None:
+        self._running += 1
+        self._threads_in_use += threads
+
+    async def _acquire(self, priority: int, threads: int) -> None:
+        if not self.queued and self._threads_in_use + threads <= self.capacity:
+            self._grant(threads)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), threads, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled; pass it on
+                self._release(threads)
+            raise
+
+    def _release(self, threads: int) -> None:
+        self._running -= 1
+        self._threads_in_use -= threads
+        # Hand freed threads to waiters in priority order, stopping at the
+        # first one that does not fit yet so it is not starved by smaller jobs
+        while self._waiters:
+            _, _, wanted, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._threads_in_use + wanted > self.capacity:
+                break
+            heapq.heappop(self._waiters)
+            self._grant(wanted)
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        label: str,
+        priority: int = RENDER_PRIORITY_PAID,
+        threads: Optional[int] = None,
+    ):
+        """
+        Wait for a render slot; yields a RenderSlot with the thread budget.
+
+        threads defaults to threads_per_job and is capped at the total capacity.
+        """
+        threads = min(threads or self.threads_per_job, self.capacity)
+        queued_at = time.monotonic()
+        await self._acquire(priority, threads)
+        grant = RenderSlot(label, priority, threads, time.monotonic() - queued_at)
+
+        started = time.monotonic()
+        try:
+            yield grant
+        finally:
+            grant.render_seconds = time.monotonic() - started
+            self._release(grant.threads)
+            self.recent.append(
+                {
+                    "label": label,
+                    "priority": priority,
+                    "threads": grant.threads,
+                    "queue_wait_seconds": round(grant.queue_wait_seconds, 3),
+                    "render_seconds": round(grant.render_seconds, 3),
+                }
+            )
+            logger.info(
+                f"Render {label} (priority {priority}): waited "
+                f"{grant.queue_wait_seconds:.1f}s, "
+                f"rendered in {grant.render_seconds:.1f}s "
+                f"with {grant.threads} threads"
+            )
+
+    def metrics(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "threads_per_job": self.threads_per_job,
+            "capacity": self.capacity,
+            "threads_in_use": self._threads_in_use,
+            "running": self._running,
+            "queued": self.queued,
+            "recent": list(self.recent),
+        }
+
+
+def _default_max_concurrent(threads_per_job: int) -> int:
+    return max(1, (os.cpu_count() or 1) // threads_per_job)
+
+
+def build_render_scheduler(
+    max_concurrent: Optional[int] = None, threads_per_job: Optional[int] = None
+) -> RenderScheduler:
+    threads = threads_per_job or settings.render_threads_per_job
+    return RenderScheduler(
+        max_concurrent=max_concurrent
+        or settings.render_max_concurrent
+        or _default_max_concurrent(threads),
+        threads_per_job=threads,
+    )
+
+
+render_scheduler = build_render_scheduler()
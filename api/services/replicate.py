@@ -0,0 +1,348 @@
+"""Replicate prediction completion: webhooks with adaptive polling fallback.
+
+Predictions are created with `Prefer: wait`, so fast models usually finish in
+the create request. Anything still running is handed to the process-wide
+PredictionTracker, which resolves the caller's future from:
+
+- the webhook route (/api/webhooks/replicate), directly when it runs in the
+  same process, or via the replicate_predictions table when it does not
+  (the worker pool); the table is checked in one query for all waiters;
+- polling with exponential backoff, switching to a single list call across
+  all outstanding predictions when many are due at once. With webhooks
+  configured, polling only runs as a slow safety net. Status polls go
+  through their own "replicate_status" limiter, so a 429 backs off instead
+  of hammering the API.
+
+Webhooks are only enabled with both REPLICATE_WEBHOOK_URL and
+REPLICATE_WEBHOOK_SECRET: an unsigned payload could otherwise point a
+scene image at any URL.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select
+
+from config import get_settings
+from database import get_session_context
+from models.db import ReplicatePrediction
+from services.http import get_http_client
+from services.scheduler import provider_slot
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+API_URL = "https://api.replicate.com/v1"
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled")
+
+# How often the webhook table is checked while predictions are outstanding
+WEBHOOK_STORE_CHECK_SECONDS = 0.5
+
+# Webhooks signed further than this from now are rejected as replays
+WEBHOOK_TIMESTAMP_TOLERANCE_SECONDS = 300
+
+if settings.replicate_webhook_url and not settings.replicate_webhook_secret:
+    logger.warning(
+        "REPLICATE_WEBHOOK_URL is set without REPLICATE_WEBHOOK_SECRET; "
+        "webhooks are disabled and predictions are polled"
+    )
+
+
+def _headers() -> dict:
+    return {
+        "Authorization": f"Token {settings.replicate_api_token}",
+        "Content-Type": "application/json",
+    }
+
+
+def webhooks_enabled() -> bool:
+    return bool(settings.replicate_webhook_url and settings.replicate_webhook_secret)
+
+
+def verify_webhook_signature(
+    body: bytes, webhook_id: str, timestamp: str, signature_header: str
+) -> bool:
+    """
+    Check a Replicate webhook signature (webhook-signature: "v1,<b64> ...").
+
+    Fails without a configured secret, and for timestamps outside
+    WEBHOOK_TIMESTAMP_TOLERANCE_SECONDS so captured deliveries cannot be
+    replayed later.
+    """
+    if not settings.replicate_webhook_secret:
+        return False
+    try:
+        sent_at = int(timestamp)
+    except ValueError:
+        return False
+    if abs(time.time() - sent_at) > WEBHOOK_TIMESTAMP_TOLERANCE_SECONDS:
+        return False
+
+    secret = settings.replicate_webhook_secret.removeprefix("whsec_")
+    signed = f"{webhook_id}.{timestamp}.".encode() + body
+    expected = base64.b64encode(
+        hmac.new(base64.b64decode(secret), signed, hashlib.sha256).digest()
+    ).decode()
+
+    for candidate in signature_header.split():
+        _, _, sig = candidate.partition(",")
+        if hmac.compare_digest(sig, expected):
+            return True
+    return False
+
+
+class _Pending:
+    def __init__(self, prediction: dict, future: asyncio.Future, interval: float):
+        self.id = prediction["id"]
+        self.get_url = prediction["urls"]["get"]
+        self.future = future
+        self.interval = interval
+        self.next_check = asyncio.get_running_loop().time() + interval
+
+
+class PredictionTracker:
+    """Waits on outstanding predictions for the whole process."""
+
+    def __init__(self):
+        self._pending: dict[str, _Pending] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._pending)
+
+    async def wait(self, prediction: dict, timeout: Optional[float] = None) -> dict:
+        """Wait until a prediction reaches a terminal status and return it."""
+        if prediction["status"] in TERMINAL_STATUSES:
+            return prediction
+
+        interval = (
+            settings.replicate_webhook_fallback_seconds
+            if webhooks_enabled()
+            else settings.replicate_poll_initial_seconds
+        )
+        future = asyncio.get_running_loop().create_future()
+        self._pending[prediction["id"]] = _Pending(prediction, future, interval)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+        try:
+            return await asyncio.wait_for(
+                future, timeout or settings.replicate_prediction_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            # Nobody will use the result; stop paying for it
+            logger.warning(f"Replicate prediction {prediction['id']} timed out")
+            await self._cancel(prediction)
+            raise
+        finally:
+            self._pending.pop(prediction["id"], None)
+
+    async def _cancel(self, prediction: dict) -> None:
+        """Cancel a prediction we gave up on; failures are only logged."""
+        url = prediction.get("urls", {}).get("cancel")
+        if not url:
+            url = f"{API_URL}/predictions/{prediction['id']}/cancel"
+        try:
+            async with provider_slot("replicate_status"):
+                response = await get_http_client("replicate").post(
+                    url, headers=_headers()
+                )
+            response.raise_for_status()
+            logger.info(f"Canceled Replicate prediction {prediction['id']}")
+        except Exception as e:
+            logger.warning(
+                f"Failed to cancel Replicate prediction {prediction['id']}: {e}"
+            )
+
+    def resolve(self, prediction: dict) -> bool:
+        """Complete a waiter from a prediction payload; True if one was waiting."""
+        pending = self._pending.get(prediction.get("id"))
+        if not pending or prediction.get("status") not in TERMINAL_STATUSES:
+            return False
+        if not pending.future.done():
+            pending.future.set_result(prediction)
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            # Failures keep waiting; individual waiters time out on their own
+            if webhooks_enabled():
+                try:
+                    await self._check_webhook_store()
+                except Exception as e:
+                    logger.warning(f"Replicate webhook store check failed: {e}")
+
+            now = loop.time()
+            due = [p for p in self._pending.values() if p.next_check <= now]
+            if due:
+                try:
+                    await self._poll(due)
+                except Exception as e:
+                    logger.warning(f"Replicate status check failed: {e}")
+
+            if not self._pending:
+                break
+            next_check = min(p.next_check for p in self._pending.values())
+            delay = max(0.05, next_check - loop.time())
+            if webhooks_enabled():
+                delay = min(delay, WEBHOOK_STORE_CHECK_SECONDS)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check_webhook_store(self) -> None:
+        """Resolve waiters whose webhook landed in another process, in one query."""
+        ids = list(self._pending)
+        async with get_session_context() as session:
+            stmt = select(ReplicatePrediction).where(ReplicatePrediction.id.in_(ids))
+            rows = (await session.execute(stmt)).scalars().all()
+            if not rows:
+                return
+            for row in rows:
+                self.resolve(
+                    {
+                        "id": row.id,
+                        "status": row.status,
+                        "output": row.output,
+                        "error": row.error,
+                    }
+                )
+            await session.execute(
+                delete(ReplicatePrediction).where(
+                    ReplicatePrediction.id.in_([row.id for row in rows])
+                )
+            )
+
+    async def _poll(self, due: list[_Pending]) -> None:
+        """Check due predictions; every one of them backs off, even on errors."""
+        try:
+            await self._poll_statuses(due)
+        finally:
+            loop = asyncio.get_running_loop()
+            for pending in due:
+                pending.interval = min(
+                    pending.interval * 1.5, settings.replicate_poll_max_seconds
+                )
+                if webhooks_enabled():
+                    pending.interval = max(
+                        pending.interval, settings.replicate_webhook_fallback_seconds
+                    )
+                pending.next_check = loop.time() + pending.interval
+
+    async def _poll_statuses(self, due: list[_Pending]) -> None:
+        client = get_http_client("replicate")
+        found: set[str] = set()
+
+        if len(due) >= settings.replicate_batch_poll_threshold:
+            # One list call covers every recent prediction on the account; if
+            # it fails, fall through to polling each prediction
+            try:
+                async with provider_slot("replicate_status"):
+                    response = await client.get(
+                        f"{API_URL}/predictions", headers=_headers()
+                    )
+                response.raise_for_status()
+                for prediction in response.json().get("results", []):
+                    if prediction.get("id") in self._pending:
+                        found.add(prediction["id"])
+                        self.resolve(prediction)
+            except Exception as e:
+                logger.warning(f"Replicate list call failed, polling each: {e}")
+
+        async def poll_one(pending: _Pending) -> None:
+            async with provider_slot("replicate_status"):
+                response = await client.get(pending.get_url, headers=_headers())
+            response.raise_for_status()
+            self.resolve(response.json())
+
+        results = await asyncio.gather(
+            *(poll_one(p) for p in due if p.id not in found), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            logger.warning(
+                f"{len(errors)} Replicate status polls failed, backing off: {errors[0]}"
+            )
+
+
+prediction_tracker = PredictionTracker()
+
+
+async def create_prediction(version: str, input: dict) -> dict:
+    """Start a prediction, waiting briefly in-request for fast models."""
+    headers = _headers()
+    if settings.replicate_sync_wait_seconds > 0:
+        headers["Prefer"] = f"wait={settings.replicate_sync_wait_seconds}"
+
+    body: dict = {"version": version, "input": input}
+    if webhooks_enabled():
+        body["webhook"] = settings.replicate_webhook_url
+        body["webhook_events_filter"] = ["completed"]
+
+    client = get_http_client("replicate")
+    response = await client.post(
+        f"{API_URL}/predictions",
+        headers=headers,
+        json=body,
+        timeout=settings.replicate_sync_wait_seconds + 30.0,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def run_prediction(version: str, input: dict) -> dict:
+    """
+    Create a prediction and wait for it to finish. Returns the final prediction.
+
+    Holds a Replicate scheduler slot for the whole run, so the concurrency cap
+    bounds predictions in flight across every pipeline in the process.
+    """
+    async with provider_slot("replicate"):
+        prediction = await create_prediction(version, input)
+        return await prediction_tracker.wait(prediction)
+
+
+async def store_webhook_prediction(prediction: dict) -> None:
+    """
+    Handle a completed prediction from the webhook.
+
+    Resolves a waiter in this process directly; otherwise stores the result
+    for the tracker in whichever worker process is waiting on it.
+    """
+    if prediction.get("status") not in TERMINAL_STATUSES:
+        return
+    if prediction_tracker.resolve(prediction):
+        return
+
+    error = prediction.get("error")
+    # Rows nobody picked up (the waiter timed out, or the prediction was not
+    # ours to wait on) are dropped once they are older than the retention
+    expired = datetime.utcnow() - timedelta(
+        seconds=settings.replicate_webhook_retention_seconds
+    )
+    async with get_session_context() as session:
+        await session.merge(
+            ReplicatePrediction(
+                id=prediction["id"],
+                status=prediction["status"],
+                output=prediction.get("output"),
+                error=str(error) if error else None,
+            )
+        )
+        await session.execute(
+            delete(ReplicatePrediction).where(ReplicatePrediction.created_at < expired)
+        )
@@ -0,0 +1,130 @@
+"""Per-provider concurrency caps and rate limits.
+
+Every call to an external provider goes through `provider_slot(name)`, which
+waits (in FIFO order) for both a free concurrency slot and a rate-limit token
+instead of letting bursts fail with 429s. Limits come from
+Settings.provider_limits and apply per process: each worker process (and the
+web process) has its own limiters, so the effective cap is the limit times
+the number of processes. Queue depth and wait times come from
+`provider_metrics()`; workers, where provider calls run, log them
+periodically and the web process serves its own at /metrics.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from config import get_settings
+
+settings = get_settings()
+
+# Used for any provider without an entry in settings.provider_limits
+DEFAULT_PROVIDER_LIMITS = {
+    "max_concurrency": 4,
+    "rate_per_second": 2.0,
+    "burst": 4,
+}
+
+
+class ProviderLimiter:
+    """Concurrency cap plus token bucket for one provider."""
+
+    def __init__(
+        self, name: str, max_concurrency: int, rate_per_second: float, burst: int
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._rate_lock = asyncio.Lock()
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+
+        # Metrics
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def _take_token(self) -> None:
+        # The lock queues callers in arrival order while one waits for a refill
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._refilled_at) * self.rate_per_second,
+                )
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+    @asynccontextmanager
+    async def slot(self):
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._take_token()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def metrics(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": self.rate_per_second,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.completed, 3)
+            if self.completed
+            else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    if provider not in _limiters:
+        limits = {
+            **DEFAULT_PROVIDER_LIMITS,
+            **settings.provider_limits.get(provider, {}),
+        }
+        _limiters[provider] = ProviderLimiter(
+            provider,
+            max_concurrency=int(limits["max_concurrency"]),
+            rate_per_second=float(limits["rate_per_second"]),
+            burst=int(limits["burst"]),
+        )
+    return _limiters[provider]
+
+
+def provider_slot(provider: str):
+    """Async context manager that waits for capacity on a provider."""
+    return get_limiter(provider).slot()
+
+
+def provider_metrics() -> dict[str, dict]:
+    return {name: limiter.metrics() for name, limiter in sorted(_limiters.items())}
@@ -0,0 +1,262 @@
+"""Object storage for generated media.
+
+Rendered videos, voiceovers and images are stored under keys such as
+"videos/<video_id>/voiceover.mp3"; those keys are what Asset.url and
+Video.formats hold. The backend is chosen by settings.storage_backend:
+
+- "local": files under settings.media_dir, for development and single-host
+  deployments
+- "s3": any S3-compatible service (AWS S3, MinIO, R2). Uploads stream from
+  disk with multipart transfers. Requires boto3 (`pip install boto3`).
+"""
+
+import asyncio
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from config import get_settings
+
+settings = get_settings()
+
+
+def is_storage_key(ref: str) -> bool:
+    """True for storage keys; False for URLs (https://, file://) in older rows."""
+    return "://" not in ref
+
+
+class Storage(ABC):
+    """Interface shared by the storage backends."""
+
+    @abstractmethod
+    async def put_file(
+        self, key: str, source: Path, content_type: Optional[str] = None
+    ) -> str:
+        """Upload a local file under key and return the key."""
+
+    @abstractmethod
+    async def put_bytes(
+        self, key: str, data: bytes, content_type: Optional[str] = None
+    ) -> str:
+        """Store bytes under key and return the key."""
+
+    @abstractmethod
+    async def download(self, key: str, dest: Path) -> Path:
+        """Copy the object at key to a local file."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """True if an object is stored under key."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove the object at key; a missing object is not an error."""
+
+    @abstractmethod
+    async def url(self, key: str, expires_seconds: int = 3600) -> str:
+        """A URL a client or provider can fetch the object from."""
+
+
+class LocalStorage(Storage):
+    """Objects as files under a root directory."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Storage key escapes the storage root: {key}")
+        return path
+
+    @staticmethod
+    def _staging_path(dest: Path) -> Path:
+        # Write beside the target then rename, so readers never see a partial file
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        return dest.with_name(f".{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+    def _copy(self, source: Path, dest: Path) -> None:
+        tmp = self._staging_path(dest)
+        shutil.copyfile(source, tmp)
+        tmp.replace(dest)
+
+    def _write(self, dest: Path, data: bytes) -> None:
+        tmp = self._staging_path(dest)
+        tmp.write_bytes(data)
+        tmp.replace(dest)
+
+    async def put_file(
+        self, key: str, source: Path, content_type: Optional[str] = None
+    ) -> str:
+        await asyncio.to_thread(self._copy, Path(source), self.path(key))
+        return key
+
+    async def put_bytes(
+        self, key: str, data: bytes, content_type: Optional[str] = None
+    ) -> str:
+        await asyncio.to_thread(self._write, self.path(key), data)
+        return key
+
+    async def download(self, key: str, dest: Path) -> Path:
+        await asyncio.to_thread(self._copy, self.path(key), Path(dest))
+        return dest
+
+    async def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    async def delete(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+
+    async def url(self, key: str, expires_seconds: int = 3600) -> str:
+        return self.path(key).as_uri()
+
+
+class S3Storage(Storage):
+    """Objects in an S3-compatible bucket."""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        multipart_chunk_bytes: int = 8 * 1024 * 1024,
+    ):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.multipart_chunk_bytes = multipart_chunk_bytes
+        self._client = None
+        self._transfer_config = None
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _get_client(self):
+        """Create the boto3 client on first use (boto3 is only needed for S3)."""
+        if self._client:
+            return self._client
+
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            region_name=self.region,
+            aws_access_key_id=self.access_key_id,
+            aws_secret_access_key=self.secret_access_key,
+        )
+        # Files above one chunk go up as a streamed multipart upload
+        self._transfer_config = TransferConfig(
+            multipart_threshold=self.multipart_chunk_bytes,
+            multipart_chunksize=self.multipart_chunk_bytes,
+        )
+        return self._client
+
+    def _upload(self, key: str, source: Path, content_type: Optional[str]) -> None:
+        client = self._get_client()
+        extra = {"ContentType": content_type} if content_type else None
+        with open(source, "rb") as f:
+            client.upload_fileobj(
+                f,
+                self.bucket,
+                self._object_key(key),
+                ExtraArgs=extra,
+                Config=self._transfer_config,
+            )
+
+    def _put_bytes(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        extra = {"ContentType": content_type} if content_type else {}
+        self._get_client().put_object(
+            Bucket=self.bucket, Key=self._object_key(key), Body=data, **extra
+        )
+
+    def _download(self, key: str, dest: Path) -> None:
+        client = self._get_client()
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with open(dest, "wb") as f:
+            client.download_fileobj(
+                self.bucket, self._object_key(key), f, Config=self._transfer_config
+            )
+
+    def _exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self._get_client().head_object(
+                Bucket=self.bucket, Key=self._object_key(key)
+            )
+            return True
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def put_file(
+        self, key: str, source: Path, content_type: Optional[str] = None
+    ) -> str:
+        await asyncio.to_thread(self._upload, key, Path(source), content_type)
+        return key
+
+    async def put_bytes(
+        self, key: str, data: bytes, content_type: Optional[str] = None
+    ) -> str:
+        await asyncio.to_thread(self._put_bytes, key, data, content_type)
+        return key
+
+    async def download(self, key: str, dest: Path) -> Path:
+        await asyncio.to_thread(self._download, key, Path(dest))
+        return dest
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists, key)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(
+            self._get_client().delete_object,
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+        )
+
+    async def url(self, key: str, expires_seconds: int = 3600) -> str:
+        return await asyncio.to_thread(
+            self._get_client().generate_presigned_url,
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=expires_seconds,
+        )
+
+
+def build_storage() -> Storage:
+    if settings.storage_backend == "s3":
+        if not settings.s3_bucket:
+            raise ValueError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        return S3Storage(
+            bucket=settings.s3_bucket,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+            multipart_chunk_bytes=settings.storage_multipart_chunk_bytes,
+        )
+    if settings.storage_backend != "local":
+        raise ValueError(f"Unknown storage backend '{settings.storage_backend}'")
+    return LocalStorage(Path(settings.media_dir))
+
+
+storage = build_storage()
+
+
+def video_key(video_id: str, name: str) -> str:
+    """Storage key for a file belonging to one video."""
+    return f"videos/{video_id}/{name}"
@@ -1,20 +1,443 @@
 """Video assembly service using FFmpeg."""
 
 import asyncio
-import subprocess
-import tempfile
+import logging
+import shutil
 from pathlib import Path
 from typing import Optional
 
 import httpx
+from pydantic import BaseModel
+
+from config import get_settings
+from services.cache import cache_key, segment_cache
+from services.http import get_http_client
+from services.media import file_sha256, probe_duration
+from services.render_queue import RENDER_PRIORITY_PAID, render_scheduler
+from services.storage import is_storage_key, storage
+from services.workspace import Workspace, workspace_manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Output dimensions per entry in Video.formats
+FORMAT_DIMENSIONS = {
+    "vertical": (1080, 1920),
+    "square": (1080, 1080),
+    "horizontal": (1920, 1080),
+}
+
+
+class RenderProfile(BaseModel):
+    """Encoder and motion settings for one render quality level."""
+
+    name: str
+    preset: str
+    crf: int
+    resolution_scale: float = 1.0  # Applied to FORMAT_DIMENSIONS
+    fps: int = 25
+    ken_burns: bool = False
+    # "crop": pan a fixed window across a once-scaled, slightly oversized
+    # still (cheap). "zoompan": per-frame zoom on the full-size frame (slow).
+    ken_burns_method: str = "crop"
+
+    def dimensions(self, output_format: str) -> tuple[int, int]:
+        width, height = FORMAT_DIMENSIONS.get(
+            output_format, FORMAT_DIMENSIONS["vertical"]
+        )
+        # libx264 needs even dimensions
+        return (
+            int(width * self.resolution_scale) // 2 * 2,
+            int(height * self.resolution_scale) // 2 * 2,
+        )
 
+    def encoder_args(self) -> list[str]:
+        return ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
 
-async def download_file(url: str, dest: Path) -> None:
-    """Download a file from URL to local path."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, follow_redirects=True, timeout=60.0)
+
+RENDER_PROFILES = {
+    # Review copies for pending_review: half resolution, fastest encode, no motion
+    "draft": RenderProfile(
+        name="draft", preset="ultrafast", crf=30, resolution_scale=0.5
+    ),
+    "standard": RenderProfile(name="standard", preset="fast", crf=23),
+    # Delivered after approval
+    "final": RenderProfile(name="final", preset="medium", crf=23, ken_burns=True),
+}
+
+
+def get_render_profile(name: str) -> RenderProfile:
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{name}'")
+    return RENDER_PROFILES[name]
+
+
+# How much larger than the output a still is scaled for the crop pan
+KEN_BURNS_OVERSAMPLE = 1.12
+
+
+def _frame_count(duration: float, fps: int) -> int:
+    return max(1, round(duration * fps))
+
+
+def ken_burns_filter(width: int, height: int, duration: float, fps: int) -> str:
+    """Slow zoom-in over one still, via zoompan on the full-size frame."""
+    return (
+        f"zoompan=z='min(zoom+0.001,1.1)':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)'"
+        f":d={_frame_count(duration, fps)}:s={width}x{height}:fps={fps}"
+    )
+
+
+def pan_filter(
+    width: int, height: int, duration: float, fps: int, scene_index: int
+) -> str:
+    """
+    Slow pan of a width x height window across an oversampled still.
+
+    The direction alternates per scene (left, right, down, up). Cropping a
+    pre-scaled frame costs almost nothing per frame, unlike zoompan, which
+    rescales the full-size frame for every output frame.
+    """
+    progress = f"n/{max(1, _frame_count(duration, fps) - 1)}"
+    x, y = {
+        0: (f"(iw-ow)*{progress}", "(ih-oh)/2"),
+        1: (f"(iw-ow)*(1-{progress})", "(ih-oh)/2"),
+        2: ("(iw-ow)/2", f"(ih-oh)*{progress}"),
+        3: ("(iw-ow)/2", f"(ih-oh)*(1-{progress})"),
+    }[scene_index % 4]
+    return f"crop={width}:{height}:x='{x}':y='{y}'"
+
+
+def _fit(width: int, height: int) -> str:
+    """Scale to fit inside width x height and pad the rest with black."""
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1"
+    )
+
+
+def _hold(duration: float, fps: int) -> str:
+    """Repeat a single decoded frame for the scene length at a fixed rate."""
+    return (
+        f"loop=loop={_frame_count(duration, fps) - 1}:size=1:start=0,"
+        f"setpts=N/{fps}/TB,fps={fps}"
+    )
+
+
+def scene_filter(
+    render_profile: RenderProfile,
+    width: int,
+    height: int,
+    duration: float,
+    scene_index: int = 0,
+) -> str:
+    """
+    Filter chain turning one still image into a scene of the given length.
+
+    Every path scales the still exactly once; motion, if any, is applied to
+    the already scaled frame.
+    """
+    fps = render_profile.fps
+    if not render_profile.ken_burns:
+        return f"{_fit(width, height)},{_hold(duration, fps)}"
+
+    if render_profile.ken_burns_method == "zoompan":
+        return f"{_fit(width, height)},{ken_burns_filter(width, height, duration, fps)}"
+
+    # Oversample just enough to leave room for the pan, keeping dims even
+    over_width = int(width * KEN_BURNS_OVERSAMPLE) // 2 * 2
+    over_height = int(height * KEN_BURNS_OVERSAMPLE) // 2 * 2
+    return (
+        f"{_fit(over_width, over_height)},{_hold(duration, fps)},"
+        f"{pan_filter(width, height, duration, fps, scene_index)}"
+    )
+
+
+def image_track_graph(
+    durations: list[float],
+    formats: list[str],
+    render_profile: RenderProfile,
+) -> tuple[list[str], dict[str, str]]:
+    """
+    Build the filter graph for the picture track.
+
+    Expects one still per input, inputs 0..len(durations)-1. Each still is
+    decoded once and split per format; the scenes are then joined with the
+    concat filter. Returns the graph and {format: output pad label}.
+    """
+    graph = []
+    for i in range(len(durations)):
+        graph.append(
+            f"[{i}:v]split={len(formats)}"
+            + "".join(f"[img{i}_{fmt}]" for fmt in formats)
+        )
+
+    labels = {}
+    for fmt in formats:
+        width, height = render_profile.dimensions(fmt)
+        for i, duration in enumerate(durations):
+            motion = scene_filter(render_profile, width, height, duration, i)
+            graph.append(f"[img{i}_{fmt}]{motion}[scene{i}_{fmt}]")
+        labels[fmt] = f"out_{fmt}"
+        graph.append(
+            "".join(f"[scene{i}_{fmt}]" for i in range(len(durations)))
+            + f"concat=n={len(durations)}:v=1:a=0,format=yuv420p[{labels[fmt]}]"
+        )
+
+    return graph, labels
+
+
+class IncompleteDownloadError(Exception):
+    """Fewer bytes arrived than the server announced."""
+
+
+async def _stream_to_part(url: str, part: Path, chunk_size: int) -> None:
+    """Stream a URL into a .part file, resuming from whatever is already there."""
+    client = get_http_client("downloads")
+    offset = part.stat().st_size if part.exists() else 0
+    # Content-Length, Content-Range and Range count bytes on the wire, so ask
+    # for the body as stored; a compressed one would match none of them
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 416:
+            # Range not satisfiable: the part file already holds everything
+            return
         response.raise_for_status()
-        dest.write_bytes(response.content)
+
+        # Some servers compress regardless. Offsets into the decoded file
+        # can't be mapped onto the wire, so such a body is only fetched whole
+        encoded = response.headers.get("content-encoding", "identity") != "identity"
+        if response.status_code == 206 and encoded:
+            part.unlink(missing_ok=True)
+            raise IncompleteDownloadError(
+                f"Compressed partial response from {url}; restarting"
+            )
+
+        if response.status_code == 206:
+            # Content-Range: bytes <start>-<end>/<total>
+            expected = int(response.headers["content-range"].rsplit("/", 1)[1])
+            mode = "ab"
+        else:
+            # Server ignored the range; start over
+            length = response.headers.get("content-length")
+            expected = int(length) if length is not None else None
+            mode = "wb"
+
+        try:
+            with open(part, mode) as f:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    f.write(chunk)
+        except BaseException:
+            if encoded:
+                part.unlink(missing_ok=True)
+            raise
+        received = (
+            response.num_bytes_downloaded if encoded else part.stat().st_size
+        )
+
+    if expected is not None and received != expected:
+        if encoded:
+            part.unlink(missing_ok=True)
+        raise IncompleteDownloadError(
+            f"Downloaded {received} of {expected} bytes from {url}"
+        )
+
+
+async def download_file(url: str, dest: Path) -> None:
+    """
+    Download a file from URL or storage key to local path.
+
+    Streams to disk in settings.download_chunk_size chunks instead of
+    buffering the body in memory, checks the size against Content-Length, and
+    resumes interrupted transfers with a Range request. Storage keys are
+    fetched from the configured storage backend; file:// URLs are copied
+    locally.
+    """
+    if is_storage_key(url):
+        await storage.download(url, dest)
+        return
+
+    if url.startswith("file://"):
+        await asyncio.to_thread(shutil.copyfile, url.removeprefix("file://"), dest)
+        return
+
+    part = dest.with_name(dest.name + ".part")
+    for attempt in range(1, settings.download_max_attempts + 1):
+        try:
+            await _stream_to_part(url, part, settings.download_chunk_size)
+            break
+        except (httpx.TransportError, IncompleteDownloadError):
+            if attempt == settings.download_max_attempts:
+                raise
+            await asyncio.sleep(attempt)
+
+    part.replace(dest)
+
+
+async def concat_audio(paths: list[Path], dest: Path) -> Path:
+    """Join audio clips of the same codec into one file without re-encoding."""
+    list_file = dest.with_suffix(".concat.txt")
+    list_file.write_text("".join(f"file '{path.resolve()}'\n" for path in paths))
+
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0", "-i", str(list_file),
+        "-c", "copy",
+        str(dest),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    list_file.unlink(missing_ok=True)
+
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg audio concat failed: {stderr.decode()}")
+
+    return dest
+
+
+async def run_ffmpeg(
+    cmd: list[str],
+    outputs: list[Path],
+    label: str,
+    priority: int = RENDER_PRIORITY_PAID,
+    threads: Optional[int] = None,
+) -> None:
+    """
+    Run an encoding FFmpeg command under the render scheduler.
+
+    Waits for a CPU slot by priority, then caps filtering and every output's
+    encoder to the slot's thread budget (threads, or the scheduler default).
+    """
+    output_args = {str(path) for path in outputs}
+
+    async with render_scheduler.slot(label, priority, threads) as slot:
+        threads = str(slot.threads)
+        args = [cmd[0], "-filter_threads", threads]
+        for arg in cmd[1:]:
+            if arg in output_args:
+                args.extend(["-threads", threads])
+            args.append(arg)
+
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed: {stderr.decode()}")
+
+
+def image_durations(
+    image_count: int,
+    audio_duration: float,
+    scene_durations: Optional[list[float]] = None,
+) -> list[float]:
+    """
+    How long each image is held.
+
+    Uses the given per-image durations (see scene_image_durations) so
+    picture and sound stay in sync. If a caller's count doesn't match the
+    images, each duration is shared by the images mapped onto it in order,
+    or consecutive ones are held on one image. Without durations the audio
+    is split evenly.
+    """
+    if not image_count:
+        return []
+    if not scene_durations:
+        return [audio_duration / image_count] * image_count
+
+    clip_count = len(scene_durations)
+    if clip_count != image_count:
+        logger.warning(
+            f"{image_count} images for {clip_count} voiceover clips; "
+            f"mapping clips onto images in order"
+        )
+    durations = [0.0] * image_count
+    for i, clip in enumerate(scene_durations):
+        first = i * image_count // clip_count
+        last = max(first + 1, (i + 1) * image_count // clip_count)
+        for j in range(first, last):
+            durations[j] += clip / (last - first)
+    return durations
+
+
+def scene_image_durations(
+    image_scenes: list[int], scene_durations: list[float]
+) -> list[float]:
+    """
+    Per-image hold times from per-scene voiceover durations.
+
+    image_scenes gives the script scene each image illustrates, in render
+    order. A scene's time is split across its images; a scene without an
+    image extends the image before it (or the first image, for leading
+    scenes) so the picture never runs ahead of the narration. Images of
+    silent scenes, or of scenes the script doesn't have, get 0.
+    """
+    durations = [0.0] * len(image_scenes)
+    if not image_scenes:
+        return durations
+
+    images_by_scene: dict[int, list[int]] = {}
+    for image, scene in enumerate(image_scenes):
+        images_by_scene.setdefault(scene, []).append(image)
+
+    previous, carried = None, 0.0
+    for scene, seconds in enumerate(scene_durations):
+        images = images_by_scene.get(scene)
+        if not images:
+            if seconds:
+                logger.warning(f"Scene {scene} has no image; holding the one before")
+            if previous is None:
+                carried += seconds
+            else:
+                durations[previous] += seconds
+            continue
+        for image in images:
+            durations[image] += seconds / len(images)
+        durations[images[0]] += carried
+        previous, carried = images[-1], 0.0
+
+    if carried:
+        # No image matched any scene; keep the audio covered
+        durations[0] += carried
+    return durations
+
+
+async def _download_assets(
+    workspace: Workspace, image_urls: list[str], audio_url: str
+) -> tuple[list[Path], Path]:
+    """Download the stills and voiceover into a workspace, in parallel."""
+    image_paths = [workspace.file(f"img_{i:03d}.png") for i in range(len(image_urls))]
+    audio_path = workspace.file("audio.mp3")
+    await asyncio.gather(
+        *(download_file(url, path) for url, path in zip(image_urls, image_paths)),
+        download_file(audio_url, audio_path),
+    )
+    await workspace.check_quota()
+    return image_paths, audio_path
+
+
+async def _store_outputs(
+    workspace: Workspace, outputs: dict[str, Path], output_prefix: Optional[str]
+) -> dict[str, str]:
+    """Upload finished renders to storage before the workspace is deleted."""
+    await workspace.check_quota()
+    output_prefix = output_prefix or f"renders/{workspace.path.name}"
+    keys = await asyncio.gather(
+        *(
+            storage.put_file(
+                f"{output_prefix}/{fmt}.mp4", path, content_type="video/mp4"
+            )
+            for fmt, path in outputs.items()
+        )
+    )
+    return dict(zip(outputs, keys))
 
 
 async def assemble_video(
@@ -23,7 +446,12 @@ async def assemble_video(
     output_format: str = "vertical",
     music_url: Optional[str] = None,
     duration_per_image: float = 5.0,
-) -> Path:
+    scene_durations: Optional[list[float]] = None,
+    label: str = "assemble_video",
+    priority: int = RENDER_PRIORITY_PAID,
+    profile: str = "final",
+    output_prefix: Optional[str] = None,
+) -> str:
     """
     Assemble a video from images and audio using FFmpeg.
 
@@ -33,113 +461,83 @@ async def assemble_video(
         output_format: 'vertical' (9:16), 'square' (1:1), or 'horizontal' (16:9)
         music_url: Optional background music URL
         duration_per_image: Seconds per image (used if no audio timing)
+        scene_durations: Seconds per image, e.g. measured per-scene voiceover
+            clips
+        label: Name for this render in logs and /metrics
+        priority: Render queue priority (RENDER_PRIORITY_PAID runs first)
+        profile: Name in RENDER_PROFILES; sets preset, crf, resolution, fps
+            and the Ken Burns motion
+        output_prefix: Storage key prefix for the finished file; defaults to
+            a new prefix under renders/
 
     Returns:
-        Path to the output video file
+        Storage key of the output video file
     """
-    # Create temp directory for assets
-    temp_dir = Path(tempfile.mkdtemp(prefix="bom_video_"))
+    render_profile = get_render_profile(profile)
 
-    try:
+    # Scratch space for downloads and the encode; deleted once the output is kept
+    async with workspace_manager.workspace(label) as workspace:
         # Download all assets in parallel
         download_tasks = []
 
         # Download images
         image_paths = []
         for i, url in enumerate(image_urls):
-            path = temp_dir / f"img_{i:03d}.png"
+            path = workspace.file(f"img_{i:03d}.png")
             image_paths.append(path)
             download_tasks.append(download_file(url, path))
 
         # Download audio
-        audio_path = temp_dir / "audio.mp3"
+        audio_path = workspace.file("audio.mp3")
         download_tasks.append(download_file(audio_url, audio_path))
 
         # Download music if provided
         music_path = None
         if music_url:
-            music_path = temp_dir / "music.mp3"
+            music_path = workspace.file("music.mp3")
             download_tasks.append(download_file(music_url, music_path))
 
         await asyncio.gather(*download_tasks)
-
-        # Determine output dimensions based on format
-        dimensions = {
-            "vertical": (1080, 1920),
-            "square": (1080, 1080),
-            "horizontal": (1920, 1080),
-        }
-        width, height = dimensions.get(output_format, (1080, 1920))
+        await workspace.check_quota()
 
         # Get audio duration
-        probe_cmd = [
-            "ffprobe",
-            "-v", "quiet",
-            "-show_entries", "format=duration",
-            "-of", "csv=p=0",
-            str(audio_path),
-        ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        audio_duration = float(result.stdout.strip()) if result.stdout.strip() else 30.0
-
-        # Calculate duration per image based on audio length
-        if image_paths:
-            duration_per_image = audio_duration / len(image_paths)
-
-        # Create concat file for images
-        concat_file = temp_dir / "concat.txt"
-        with open(concat_file, "w") as f:
-            for path in image_paths:
-                f.write(f"file '{path}'\n")
-                f.write(f"duration {duration_per_image}\n")
-            # Add last image again (FFmpeg concat quirk)
-            if image_paths:
-                f.write(f"file '{image_paths[-1]}'\n")
-
-        output_path = temp_dir / "output.mp4"
-
-        # Build FFmpeg command
-        cmd = [
-            "ffmpeg",
-            "-y",  # Overwrite output
-            "-f", "concat",
-            "-safe", "0",
-            "-i", str(concat_file),
-            "-i", str(audio_path),
-        ]
+        audio_duration = (
+            await probe_duration(audio_path) or duration_per_image * len(image_paths)
+        )
+
+        # Hold each image for its scene's share of the audio
+        durations = image_durations(len(image_paths), audio_duration, scene_durations)
+
+        output_path = workspace.file("output.mp4")
+
+        # One input per still, then the voiceover
+        cmd = ["ffmpeg", "-y"]
+        for path in image_paths:
+            cmd.extend(["-i", str(path)])
+        audio_input = len(image_paths)
+        cmd.extend(["-i", str(audio_path)])
+
+        filter_complex, labels = image_track_graph(
+            durations, [output_format], render_profile
+        )
 
         # Add music if present
-        filter_complex = []
         if music_path:
             cmd.extend(["-i", str(music_path)])
             # Mix audio tracks - voiceover at full volume, music at 20%
-            filter_complex.append("[1:a]volume=1.0[vo]")
-            filter_complex.append("[2:a]volume=0.2[music]")
+            filter_complex.append(f"[{audio_input}:a]volume=1.0[vo]")
+            filter_complex.append(f"[{audio_input + 1}:a]volume=0.2[music]")
             filter_complex.append("[vo][music]amix=inputs=2:duration=first[aout]")
             audio_map = "[aout]"
         else:
-            audio_map = "1:a"
-
-        # Video filters: scale and pad to target dimensions with Ken Burns effect
-        video_filter = (
-            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
-            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,"
-            f"zoompan=z='min(zoom+0.001,1.1)':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':d={int(duration_per_image * 25)}:s={width}x{height}:fps=25"
-        )
+            audio_map = f"{audio_input}:a"
 
-        if filter_complex:
-            filter_complex.insert(0, f"[0:v]{video_filter}[vout]")
-            cmd.extend(["-filter_complex", ";".join(filter_complex)])
-            cmd.extend(["-map", "[vout]", "-map", audio_map])
-        else:
-            cmd.extend(["-vf", video_filter])
-            cmd.extend(["-map", "0:v", "-map", audio_map])
+        cmd.extend(["-filter_complex", ";".join(filter_complex)])
+        cmd.extend(["-map", f"[{labels[output_format]}]", "-map", audio_map])
 
         # Output settings
         cmd.extend([
-            "-c:v", "libx264",
-            "-preset", "medium",
-            "-crf", "23",
+            *render_profile.encoder_args(),
             "-c:a", "aac",
             "-b:a", "128k",
             "-shortest",
@@ -148,88 +546,256 @@ async def assemble_video(
         ])
 
         # Run FFmpeg
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
-            raise RuntimeError(f"FFmpeg failed: {stderr.decode()}")
+        await run_ffmpeg(cmd, [output_path], label=label, priority=priority)
 
-        return output_path
+        outputs = await _store_outputs(
+            workspace, {output_format: output_path}, output_prefix
+        )
 
-    except Exception:
-        # Clean up on error (but keep temp_dir for debugging)
-        raise
+    return outputs[output_format]
 
 
 async def assemble_video_simple(
     image_urls: list[str],
     audio_url: str,
     output_format: str = "vertical",
-) -> Path:
+    scene_durations: Optional[list[float]] = None,
+    label: str = "assemble_video_simple",
+    priority: int = RENDER_PRIORITY_PAID,
+    profile: str = "standard",
+    output_prefix: Optional[str] = None,
+) -> str:
     """
     Simpler video assembly without Ken Burns effect.
 
-    Faster processing, less fancy.
+    Faster processing, less fancy. With scene_durations, each image is held
+    for exactly its scene's voiceover length.
     """
-    temp_dir = Path(tempfile.mkdtemp(prefix="bom_video_"))
+    outputs = await assemble_video_formats(
+        image_urls,
+        audio_url,
+        formats=[output_format],
+        scene_durations=scene_durations,
+        label=label,
+        priority=priority,
+        profile=profile,
+        output_prefix=output_prefix,
+    )
+    return outputs[output_format]
 
-    # Download assets
-    image_paths = []
-    for i, url in enumerate(image_urls):
-        path = temp_dir / f"img_{i:03d}.png"
-        await download_file(url, path)
-        image_paths.append(path)
 
-    audio_path = temp_dir / "audio.mp3"
-    await download_file(audio_url, audio_path)
+async def assemble_video_formats(
+    image_urls: list[str],
+    audio_url: str,
+    formats: Optional[list[str]] = None,
+    scene_durations: Optional[list[float]] = None,
+    label: str = "assemble_video_formats",
+    priority: int = RENDER_PRIORITY_PAID,
+    profile: str = "standard",
+    output_prefix: Optional[str] = None,
+) -> dict[str, str]:
+    """
+    Render several aspect ratios in one FFmpeg pass.
 
-    # Get audio duration
-    probe_cmd = [
-        "ffprobe", "-v", "quiet",
-        "-show_entries", "format=duration",
-        "-of", "csv=p=0",
-        str(audio_path),
-    ]
-    result = subprocess.run(probe_cmd, capture_output=True, text=True)
-    audio_duration = float(result.stdout.strip()) if result.stdout.strip() else 30.0
-    duration_per_image = audio_duration / len(image_paths) if image_paths else 5.0
+    Assets are downloaded and each still decoded once; the image track is
+    split inside the filter graph and scaled/padded per format, with one
+    encoded output file per format. The render profile (see
+    RENDER_PROFILES) sets encoder settings, resolution, fps and Ken Burns
+    motion for every output.
 
-    # Dimensions
-    dimensions = {"vertical": (1080, 1920), "square": (1080, 1080), "horizontal": (1920, 1080)}
-    width, height = dimensions.get(output_format, (1080, 1920))
+    The render runs in its own workspace; finished files are uploaded to
+    storage as "<output_prefix>/<format>.mp4" (default prefix: a new one
+    under renders/).
 
-    # Create concat file
-    concat_file = temp_dir / "concat.txt"
-    with open(concat_file, "w") as f:
+    Returns {format: storage key}, ready to store in Video.formats.
+    """
+    render_profile = get_render_profile(profile)
+    formats = formats or list(FORMAT_DIMENSIONS)
+
+    async with workspace_manager.workspace(label) as workspace:
+        image_paths, audio_path = await _download_assets(
+            workspace, image_urls, audio_url
+        )
+
+        audio_duration = await probe_duration(audio_path) or 30.0
+        durations = image_durations(len(image_paths), audio_duration, scene_durations)
+
+        graph, labels = image_track_graph(durations, formats, render_profile)
+
+        cmd = ["ffmpeg", "-y"]
         for path in image_paths:
-            f.write(f"file '{path}'\n")
-            f.write(f"duration {duration_per_image}\n")
-        if image_paths:
-            f.write(f"file '{image_paths[-1]}'\n")
+            cmd.extend(["-i", str(path)])
+        audio_input = len(image_paths)
+        cmd.extend(["-i", str(audio_path), "-filter_complex", ";".join(graph)])
+
+        outputs = {}
+        for fmt in formats:
+            output_path = workspace.file(f"output_{fmt}.mp4")
+            outputs[fmt] = output_path
+            cmd.extend([
+                "-map", f"[{labels[fmt]}]", "-map", f"{audio_input}:a",
+                *render_profile.encoder_args(),
+                "-c:a", "aac", "-b:a", "128k",
+                "-shortest", "-movflags", "+faststart",
+                str(output_path),
+            ])
+
+        await run_ffmpeg(cmd, list(outputs.values()), label=label, priority=priority)
+
+        return await _store_outputs(workspace, outputs, output_prefix)
+
+
+def _segment_key(
+    image_sha256: str, duration: float, scene_index: int, width: int, height: int,
+    render_profile: RenderProfile,
+) -> str:
+    """Everything that determines a scene segment's encoded bytes."""
+    panning = render_profile.ken_burns and render_profile.ken_burns_method == "crop"
+    return cache_key(
+        "segment",
+        image_sha256,
+        round(duration, 3),
+        scene_index % 4 if panning else None,  # Pan direction
+        width,
+        height,
+        render_profile.model_dump(),
+    )
+
 
-    output_path = temp_dir / "output.mp4"
+async def render_scene_segment(
+    image_path: Path,
+    duration: float,
+    scene_index: int,
+    output_format: str,
+    render_profile: RenderProfile,
+    work_dir: Path,
+    label: str,
+    priority: int = RENDER_PRIORITY_PAID,
+) -> Path:
+    """
+    Encode one scene (still, duration, motion) as a video-only segment.
 
+    Segments are cached by image content, duration, motion, dimensions and
+    profile, so re-rendering a video only encodes the scenes that changed.
+    """
+    width, height = render_profile.dimensions(output_format)
+    key = _segment_key(
+        await file_sha256(image_path),
+        duration,
+        scene_index,
+        width,
+        height,
+        render_profile,
+    )
+    # The workspace keeps its own link: another render may evict the entry
+    # before this one is muxed
+    output_path = work_dir / f"segment_{output_format}_{scene_index:03d}.mp4"
+    cached = await segment_cache.get(key, dest=output_path)
+    if cached:
+        return cached
+
+    motion = scene_filter(render_profile, width, height, duration, scene_index)
+    video_filter = f"{motion},format=yuv420p"
     cmd = [
         "ffmpeg", "-y",
-        "-f", "concat", "-safe", "0", "-i", str(concat_file),
-        "-i", str(audio_path),
-        "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black",
-        "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-        "-c:a", "aac", "-b:a", "128k",
-        "-shortest", "-movflags", "+faststart",
+        "-i", str(image_path),
+        "-vf", video_filter,
+        "-an",
+        *render_profile.encoder_args(),
         str(output_path),
     ]
+    await run_ffmpeg(
+        cmd,
+        [output_path],
+        label=f"{label}:{output_format}:scene{scene_index}",
+        priority=priority,
+        threads=settings.render_segment_threads,
+    )
+    return await segment_cache.put_file(key, output_path, dest=output_path)
+
+
+async def mux_segments(segment_paths: list[Path], audio_path: Path, dest: Path) -> Path:
+    """Join encoded segments without re-encoding and add the audio track."""
+    list_file = dest.with_suffix(".concat.txt")
+    list_file.write_text(
+        "".join(f"file '{path.resolve()}'\n" for path in segment_paths)
+    )
 
     process = await asyncio.create_subprocess_exec(
-        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0", "-i", str(list_file),
+        "-i", str(audio_path),
+        "-map", "0:v", "-map", "1:a",
+        "-c:v", "copy",
+        "-c:a", "aac", "-b:a", "128k",
+        "-shortest", "-movflags", "+faststart",
+        str(dest),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
     )
-    stdout, stderr = await process.communicate()
+    _, stderr = await process.communicate()
+    list_file.unlink(missing_ok=True)
 
     if process.returncode != 0:
-        raise RuntimeError(f"FFmpeg failed: {stderr.decode()}")
+        raise RuntimeError(f"FFmpeg segment mux failed: {stderr.decode()}")
+
+    return dest
+
+
+async def assemble_video_segments(
+    image_urls: list[str],
+    audio_url: str,
+    formats: Optional[list[str]] = None,
+    scene_durations: Optional[list[float]] = None,
+    label: str = "assemble_video_segments",
+    priority: int = RENDER_PRIORITY_PAID,
+    profile: str = "standard",
+    output_prefix: Optional[str] = None,
+) -> dict[str, str]:
+    """
+    Render several aspect ratios by encoding every scene as its own segment.
+
+    All scene segments of all formats are submitted at once and run in
+    parallel as far as the render scheduler's thread budget allows, each
+    with settings.render_segment_threads threads. Each format's segments are
+    then joined with the concat demuxer using stream copy and muxed with the
+    voiceover, so the only serial work is a cheap remux.
+
+    Same arguments and return value as assemble_video_formats.
+    """
+    render_profile = get_render_profile(profile)
+    formats = formats or list(FORMAT_DIMENSIONS)
+
+    async with workspace_manager.workspace(label) as workspace:
+        image_paths, audio_path = await _download_assets(
+            workspace, image_urls, audio_url
+        )
+
+        audio_duration = await probe_duration(audio_path) or 30.0
+        durations = image_durations(len(image_paths), audio_duration, scene_durations)
+
+        segments = await asyncio.gather(
+            *(
+                render_scene_segment(
+                    path,
+                    duration,
+                    i,
+                    fmt,
+                    render_profile,
+                    workspace.path,
+                    label,
+                    priority,
+                )
+                for fmt in formats
+                for i, (path, duration) in enumerate(zip(image_paths, durations))
+            )
+        )
+
+        outputs = {}
+        for n, fmt in enumerate(formats):
+            fmt_segments = segments[n * len(image_paths):(n + 1) * len(image_paths)]
+            outputs[fmt] = await mux_segments(
+                fmt_segments, audio_path, workspace.file(f"output_{fmt}.mp4")
+            )
 
-    return output_path
+        return await _store_outputs(workspace, outputs, output_prefix)
@@ -1,8 +1,12 @@
 """Voice generation service using ElevenLabs."""
 
-import httpx
+import asyncio
+from pathlib import Path
 
 from config import get_settings
+from services.cache import cache_key, voice_cache
+from services.http import get_http_client
+from services.scheduler import provider_slot
 
 settings = get_settings()
 
@@ -14,16 +18,27 @@ DEFAULT_VOICES = {
     "english_female": "21m00Tcm4TlvDq8ikWAM",
 }
 
+VOICE_MODEL_ID = "eleven_multilingual_v2"
+VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75,
+}
 
-async def generate_voiceover(
+
+async def synthesize_voiceover(
     text: str,
     voice_id: str | None = None,
     language: str = "EN",
-) -> bytes:
+    regenerate: bool = False,
+    dest: Path | None = None,
+) -> Path:
     """
-    Generate voiceover audio using ElevenLabs.
+    Generate voiceover audio using ElevenLabs, through the voice cache.
 
-    Returns the audio file as bytes (MP3 format).
+    Returns the path of the cached MP3, or dest if given: a link to it that
+    stays readable if the cache evicts the entry. The cache key covers the
+    text, voice, model and voice settings, so re-renders of the same script
+    skip TTS entirely. Pass regenerate=True to force a fresh take.
     """
     if not settings.elevenlabs_api_key:
         raise ValueError("ELEVENLABS_API_KEY not configured")
@@ -35,7 +50,14 @@ async def generate_voiceover(
         else:
             voice_id = DEFAULT_VOICES["english_male"]
 
-    async with httpx.AsyncClient() as client:
+    key = cache_key(text, voice_id, VOICE_MODEL_ID, VOICE_SETTINGS)
+    if not regenerate:
+        cached = await voice_cache.get(key, dest=dest)
+        if cached:
+            return cached
+
+    client = get_http_client("elevenlabs")
+    async with provider_slot("elevenlabs"):
         response = await client.post(
             f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
             headers={
@@ -44,17 +66,94 @@ async def generate_voiceover(
             },
             json={
                 "text": text,
-                "model_id": "eleven_multilingual_v2",
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.75,
-                },
+                "model_id": VOICE_MODEL_ID,
+                "voice_settings": VOICE_SETTINGS,
             },
-            timeout=60.0,
         )
-        response.raise_for_status()
+    response.raise_for_status()
+
+    return await voice_cache.put(key, response.content, dest=dest)
+
+
+async def generate_voiceover(
+    text: str,
+    voice_id: str | None = None,
+    language: str = "EN",
+) -> bytes:
+    """
+    Generate voiceover audio using ElevenLabs.
+
+    Returns the audio file as bytes (MP3 format).
+    """
+    path = await synthesize_voiceover(text, voice_id=voice_id, language=language)
+    return path.read_bytes()
+
+
+async def synthesize_scene_voiceovers(
+    texts: list[str],
+    voice_id: str | None = None,
+    language: str = "EN",
+    regenerate: bool = False,
+    dest_dir: Path | None = None,
+) -> list[Path]:
+    """
+    Synthesize one clip per scene concurrently.
+
+    Total latency is the slowest scene rather than the sum; each clip is
+    cached on its own, so editing one scene only re-synthesizes that scene.
+    With dest_dir, clips are linked there as scene_000.mp3, scene_001.mp3...
+    """
+    return list(
+        await asyncio.gather(
+            *(
+                synthesize_voiceover(
+                    text,
+                    voice_id=voice_id,
+                    language=language,
+                    regenerate=regenerate,
+                    dest=dest_dir / f"scene_{i:03d}.mp3" if dest_dir else None,
+                )
+                for i, text in enumerate(texts)
+            )
+        )
+    )
+
+
+def script_to_scene_texts(script: dict) -> list[tuple[int, str]]:
+    """
+    Split a script into (scene index, narration) for each spoken scene.
+
+    The hook is spoken over the first spoken scene and the CTA over the last.
+    Scenes without narration get no clip (ElevenLabs rejects empty text);
+    their index is simply absent, so clips stay tied to their scenes.
+    """
+    texts = [
+        (i, text)
+        for i, scene in enumerate(script.get("scenes", []))
+        if (text := (scene.get("text") or "").strip())
+    ]
+    if not texts:
+        text = script_to_voiceover_text(script)
+        if not text:
+            raise ValueError("Script has no narration to synthesize")
+        return [(0, text)]
+
+    hook, cta = script.get("hook", ""), script.get("cta", "")
+    first, text = texts[0]
+    texts[0] = (first, " ".join(part for part in (hook, text) if part))
+    last, text = texts[-1]
+    texts[-1] = (last, " ".join(part for part in (text, cta) if part))
+    return texts
+
 
-        return response.content
+def clip_durations_by_scene(
+    scene_texts: list[tuple[int, str]], clip_durations: list[float], scene_count: int
+) -> list[float]:
+    """One duration per script scene: its clip's length, 0 for silent scenes."""
+    durations = [0.0] * max(scene_count, 1)
+    for (scene, _), seconds in zip(scene_texts, clip_durations):
+        durations[scene] = seconds
+    return durations
 
 
 def script_to_voiceover_text(script: dict) -> str:
@@ -0,0 +1,218 @@
+"""Scoped scratch directories for renders.
+
+Every render runs in its own workspace under settings.workspace_dir. A
+workspace has a disk quota and is deleted as soon as the render succeeds;
+finished files are uploaded to storage first. A failed workspace is marked and
+kept for settings.workspace_keep_failed_seconds so it can be inspected. A
+background sweeper removes expired and abandoned workspaces and keeps the
+total size under settings.workspace_max_total_bytes.
+
+Several worker processes can share one workspace root, so a workspace in use
+carries an ACTIVE_MARKER file that its process touches every
+ACTIVE_TOUCH_SECONDS. The sweeper never evicts a workspace whose marker is
+fresh, whichever process owns it.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FAILED_MARKER = ".failed"
+ACTIVE_MARKER = ".active"
+ACTIVE_TOUCH_SECONDS = 30
+# A marker untouched this long belongs to a process that died mid-render
+ACTIVE_TIMEOUT_SECONDS = 4 * ACTIVE_TOUCH_SECONDS
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """A render wrote more to its workspace than its quota allows."""
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for entry in path.rglob("*"):
+        try:
+            if entry.is_file():
+                total += entry.stat().st_size
+        except FileNotFoundError:
+            pass
+    return total
+
+
+class Workspace:
+    """One render's scratch directory."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def file(self, name: str) -> Path:
+        return self.path / name
+
+    async def used_bytes(self) -> int:
+        return await asyncio.to_thread(_tree_size, self.path)
+
+    async def check_quota(self) -> None:
+        """Raise WorkspaceQuotaExceeded if the workspace is over its quota."""
+        used = await self.used_bytes()
+        if used > self.max_bytes:
+            raise WorkspaceQuotaExceeded(
+                f"Workspace {self.path.name} uses {used} bytes, "
+                f"quota is {self.max_bytes}"
+            )
+
+
+def _in_use_elsewhere(path: Path, now: float) -> bool:
+    """True if another process is still touching the workspace's active marker."""
+    try:
+        return now - (path / ACTIVE_MARKER).stat().st_mtime < ACTIVE_TIMEOUT_SECONDS
+    except FileNotFoundError:
+        return False
+
+
+async def _keep_alive(marker: Path) -> None:
+    while True:
+        await asyncio.sleep(ACTIVE_TOUCH_SECONDS)
+        try:
+            marker.touch()
+        except FileNotFoundError:
+            return
+
+
+class WorkspaceManager:
+    """Creates, cleans up and sweeps render workspaces under one root."""
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int,
+        keep_failed_seconds: int,
+        stale_seconds: int,
+        max_total_bytes: int,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.keep_failed_seconds = keep_failed_seconds
+        self.stale_seconds = stale_seconds
+        self.max_total_bytes = max_total_bytes
+        self._active: set[Path] = set()
+
+    @asynccontextmanager
+    async def workspace(self, label: str, max_bytes: Optional[int] = None):
+        """
+        Yield a fresh Workspace for one render.
+
+        Deleted on success. On error it is marked failed and left for the
+        sweeper, which removes it after keep_failed_seconds.
+        """
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", label).strip("-")[:60] or "render"
+        path = self.root / f"{slug}-{uuid.uuid4().hex[:8]}"
+        path.mkdir(parents=True)
+        marker = path / ACTIVE_MARKER
+        marker.write_text(f"{socket.gethostname()}:{os.getpid()}\n")
+        self._active.add(path)
+        heartbeat = asyncio.create_task(_keep_alive(marker))
+
+        try:
+            yield Workspace(path, max_bytes or self.max_bytes)
+        except BaseException as e:
+            heartbeat.cancel()
+            (path / FAILED_MARKER).write_text(f"{type(e).__name__}: {e}\n")
+            marker.unlink(missing_ok=True)
+            logger.warning(f"Render {label} failed; keeping workspace {path}")
+            raise
+        else:
+            heartbeat.cancel()
+            await asyncio.to_thread(shutil.rmtree, path, True)
+        finally:
+            heartbeat.cancel()
+            self._active.discard(path)
+
+    def _sweep(self) -> int:
+        """Remove expired and abandoned workspaces, then enforce the total size."""
+        if not self.root.exists():
+            return 0
+
+        now = time.time()
+        removed = 0
+        kept: list[tuple[float, int, Path]] = []  # (age reference, size, path)
+        in_use = [path for path in self._active if path.exists()]
+
+        for path in self.root.iterdir():
+            if not path.is_dir() or path in self._active:
+                continue
+            if _in_use_elsewhere(path, now):
+                # Another worker process is rendering here
+                in_use.append(path)
+                continue
+            marker = path / FAILED_MARKER
+            try:
+                if marker.exists():
+                    reference, limit = marker.stat().st_mtime, self.keep_failed_seconds
+                else:
+                    # Left behind by a process that died mid-render
+                    reference, limit = path.stat().st_mtime, self.stale_seconds
+            except FileNotFoundError:
+                continue
+
+            if now - reference > limit:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+            else:
+                kept.append((reference, _tree_size(path), path))
+
+        total = sum(size for _, size, _ in kept) + sum(
+            _tree_size(path) for path in in_use
+        )
+        # Over budget: drop the oldest inactive workspaces first
+        for _, size, path in sorted(kept):
+            if total <= self.max_total_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        if total > self.max_total_bytes:
+            logger.warning(
+                f"Render workspaces use {total} bytes (limit {self.max_total_bytes}) "
+                f"after sweeping; all remaining ones are in use"
+            )
+        return removed
+
+    async def sweep(self) -> int:
+        """Run one sweep off the event loop; returns the number removed."""
+        removed = await asyncio.to_thread(self._sweep)
+        if removed:
+            logger.info(f"Swept {removed} render workspaces from {self.root}")
+        return removed
+
+    async def run_sweeper(self, interval_seconds: float) -> None:
+        """Sweep forever at the given interval; run as a background task."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Workspace sweep failed")
+            await asyncio.sleep(interval_seconds)
+
+
+workspace_manager = WorkspaceManager(
+    root=Path(settings.workspace_dir),
+    max_bytes=settings.workspace_max_bytes,
+    keep_failed_seconds=settings.workspace_keep_failed_seconds,
+    stale_seconds=settings.workspace_stale_seconds,
+    max_total_bytes=settings.workspace_max_total_bytes,
+)
@@ -0,0 +1,81 @@
+"""Shared fixtures: a throwaway SQLite database and an in-process API client.
+
+Settings are read at import time, so the environment is pointed at a temp
+directory before any app module is imported.
+"""
+
+import asyncio
+import os
+import tempfile
+import uuid
+
+_tmp = tempfile.mkdtemp(prefix="bom-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/test.db"
+os.environ["MEDIA_DIR"] = f"{_tmp}/media"
+os.environ["WORKSPACE_DIR"] = f"{_tmp}/workspaces"
+os.environ["CACHE_DIR"] = f"{_tmp}/cache"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from database import engine, get_session_context, init_db  # noqa: E402
+from main import app  # noqa: E402
+from models.db import Client, Project  # noqa: E402
+from services import scheduler  # noqa: E402
+from services.auth import create_access_token  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    async def setup():
+        await init_db()
+        await engine.dispose()
+
+    asyncio.run(setup())
+
+
+@pytest.fixture(autouse=True)
+async def fresh_pools(monkeypatch):
+    """Per-test event loops: drop pooled connections and asyncio limiters."""
+    monkeypatch.setattr(scheduler, "_limiters", {})
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def api():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def owner() -> dict:
+    """A client with one project, plus auth headers for it."""
+    async with get_session_context() as session:
+        client = Client(name="Test", email=f"{uuid.uuid4().hex}@example.com")
+        session.add(client)
+        await session.flush()
+        project = Project(client_id=client.id, name="Test project")
+        session.add(project)
+        await session.flush()
+    token = create_access_token(client.id, client.email)
+    return {
+        "client_id": client.id,
+        "project_id": project.id,
+        "headers": {"Authorization": f"Bearer {token}"},
+    }
+
+
+@pytest.fixture
+def statements():
+    """(sql, parameters) for each statement executed while the test runs."""
+    executed: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
@@ -0,0 +1,64 @@
+"""Blob cache writes: concurrent stores of one key never collide."""
+
+import asyncio
+
+import pytest
+
+from services.cache import BlobCache, cache_key
+
+
+@pytest.fixture
+def blobs() -> BlobCache:
+    return BlobCache("test-blobs", max_bytes=100_000_000, suffix=".bin")
+
+
+async def test_concurrent_puts_of_one_key(blobs):
+    key = cache_key("same", "clip")
+    payloads = [bytes([i]) * 1_000_000 for i in range(16)]
+
+    paths = await asyncio.gather(*(blobs.put(key, data) for data in payloads))
+
+    assert len(set(paths)) == 1
+    assert paths[0].read_bytes() in payloads
+    # No staging files left behind
+    assert [p.name for p in paths[0].parent.iterdir()] == [paths[0].name]
+
+
+async def test_concurrent_put_files_of_one_key(blobs, tmp_path):
+    key = cache_key("same", "segment")
+    sources = []
+    for i in range(16):
+        source = tmp_path / f"segment-{i}.bin"
+        source.write_bytes(bytes([i]) * 500_000)
+        sources.append(source)
+
+    paths = await asyncio.gather(*(blobs.put_file(key, s) for s in sources))
+
+    assert len(set(paths)) == 1
+    assert await blobs.get(key) == paths[0]
+
+
+async def test_linked_copy_survives_eviction(tmp_path):
+    blobs = BlobCache("test-evict", max_bytes=1_500, suffix=".bin")
+    clip = tmp_path / "scene_000.mp3"
+
+    assert await blobs.put(cache_key("a"), b"a" * 1_000, dest=clip) == clip
+    # A second entry pushes the first one out while the render still needs it
+    await blobs.put(cache_key("b"), b"b" * 1_000)
+
+    assert await blobs.get(cache_key("a")) is None
+    assert clip.read_bytes() == b"a" * 1_000
+
+
+async def test_hit_is_linked_to_dest(tmp_path):
+    blobs = BlobCache("test-link", max_bytes=1_500, suffix=".mp4")
+    segment = tmp_path / "segment.mp4"
+    segment.write_bytes(b"s" * 1_000)
+
+    # Moved into the cache, linked back where the render expects it
+    assert await blobs.put_file(cache_key("s"), segment, dest=segment) == segment
+    again = tmp_path / "again.mp4"
+    assert await blobs.get(cache_key("s"), dest=again) == again
+
+    await blobs.put(cache_key("t"), b"t" * 1_000)
+    assert segment.read_bytes() == again.read_bytes() == b"s" * 1_000
@@ -0,0 +1,135 @@
+"""Streamed downloads: size checks, Range resume and compressed bodies."""
+
+import gzip
+
+import httpx
+import pytest
+
+from config import get_settings
+from services.http import provider_clients
+from services.video import IncompleteDownloadError, download_file
+
+settings = get_settings()
+
+URL = "https://cdn.test/image.png"
+BODY = bytes(range(256)) * 400
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Install a fake CDN; returns the list of requests it received."""
+    requests: list[httpx.Request] = []
+
+    def install(handler):
+        def record(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return handler(request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+        monkeypatch.setitem(provider_clients._clients, "downloads", client)
+        return requests
+
+    monkeypatch.setattr(settings, "download_max_attempts", 1)
+    return install
+
+
+def range_start(request: httpx.Request) -> int:
+    return int(request.headers["range"].removeprefix("bytes=").rstrip("-"))
+
+
+async def test_plain_download_asks_for_identity(server, tmp_path):
+    requests = server(lambda request: httpx.Response(200, content=BODY))
+
+    await download_file(URL, tmp_path / "image.png")
+
+    assert (tmp_path / "image.png").read_bytes() == BODY
+    assert requests[0].headers["accept-encoding"] == "identity"
+
+
+async def test_gzip_body_is_checked_against_wire_length(server, tmp_path):
+    compressed = gzip.compress(BODY)
+    server(
+        lambda request: httpx.Response(
+            200,
+            headers={
+                "content-encoding": "gzip",
+                "content-length": str(len(compressed)),
+            },
+            stream=httpx.ByteStream(compressed),
+        )
+    )
+
+    await download_file(URL, tmp_path / "image.png")
+
+    assert (tmp_path / "image.png").read_bytes() == BODY
+
+
+async def test_short_body_fails_size_check(server, tmp_path):
+    server(
+        lambda request: httpx.Response(
+            200,
+            headers={"content-length": str(len(BODY))},
+            stream=httpx.ByteStream(BODY[:1000]),
+        )
+    )
+
+    with pytest.raises(IncompleteDownloadError, match=f"1000 of {len(BODY)}"):
+        await download_file(URL, tmp_path / "image.png")
+
+
+async def test_resume_appends_partial_content(server, tmp_path):
+    (tmp_path / "image.png.part").write_bytes(BODY[:5000])
+
+    def partial(request):
+        start = range_start(request)
+        return httpx.Response(
+            206,
+            headers={"content-range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"},
+            content=BODY[start:],
+        )
+
+    requests = server(partial)
+
+    await download_file(URL, tmp_path / "image.png")
+
+    assert requests[0].headers["range"] == "bytes=5000-"
+    assert (tmp_path / "image.png").read_bytes() == BODY
+
+
+async def test_resume_ignored_by_server_starts_over(server, tmp_path):
+    (tmp_path / "image.png.part").write_bytes(b"stale" * 100)
+    server(lambda request: httpx.Response(200, content=BODY))
+
+    await download_file(URL, tmp_path / "image.png")
+
+    assert (tmp_path / "image.png").read_bytes() == BODY
+
+
+async def test_range_not_satisfiable_keeps_complete_part(server, tmp_path):
+    (tmp_path / "image.png.part").write_bytes(BODY)
+    server(lambda request: httpx.Response(416))
+
+    await download_file(URL, tmp_path / "image.png")
+
+    assert (tmp_path / "image.png").read_bytes() == BODY
+    assert not (tmp_path / "image.png.part").exists()
+
+
+async def test_compressed_partial_response_restarts(server, tmp_path):
+    (tmp_path / "image.png.part").write_bytes(BODY[:5000])
+    server(
+        lambda request: httpx.Response(
+            206,
+            headers={
+                "content-encoding": "gzip",
+                "content-range": f"bytes 5000-{len(BODY) - 1}/{len(BODY)}",
+            },
+            content=gzip.compress(BODY[5000:]),
+        )
+    )
+
+    with pytest.raises(IncompleteDownloadError):
+        await download_file(URL, tmp_path / "image.png")
+
+    # The next attempt fetches the whole body instead of resuming
+    assert not (tmp_path / "image.png.part").exists()
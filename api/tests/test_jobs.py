@@ -0,0 +1,199 @@
+"""Job queue: dedupe races, reaping abandoned final attempts, worker leases."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import worker as worker_module
+from config import get_settings
+from database import get_session_context
+from models.db import Job, Project, Video
+from services import jobs
+from services.jobs import claim_job, enqueue_job, fail_job, reap_expired_jobs
+from worker import WorkerPool
+
+settings = get_settings()
+
+
+async def test_concurrent_enqueue_returns_existing_job():
+    # Session A inserts the key and holds the write lock; B has already
+    # passed its dedupe check and hits the unique constraint once A commits
+    async with get_session_context() as a:
+        first = await enqueue_job(a, kind="race", payload={}, dedupe_key="tally:race")
+
+        async def enqueue_in_b():
+            async with get_session_context() as b:
+                original = jobs._job_by_dedupe_key
+                calls = 0
+
+                async def miss_first(session, key):
+                    nonlocal calls
+                    calls += 1
+                    return None if calls == 1 else await original(session, key)
+
+                jobs._job_by_dedupe_key = miss_first
+                try:
+                    job = await enqueue_job(
+                        b, kind="race", payload={}, dedupe_key="tally:race"
+                    )
+                finally:
+                    jobs._job_by_dedupe_key = original
+                return job.id
+
+        second = asyncio.create_task(enqueue_in_b())
+        await asyncio.sleep(0.2)
+
+    assert await second == first.id
+
+
+async def test_final_attempt_with_expired_lease_is_failed(owner):
+    async with get_session_context() as session:
+        video = Video(
+            project_id=owner["project_id"], client_id=owner["client_id"], title="V"
+        )
+        session.add(video)
+        await session.flush()
+        job = Job(
+            kind="reap_test",
+            payload={},
+            status="running",
+            attempts=3,
+            max_attempts=3,
+            lease_owner="dead",
+            lease_expires_at=datetime.utcnow() - timedelta(seconds=1),
+            video_id=video.id,
+        )
+        session.add(job)
+
+    assert await claim_job("live", kinds=["reap_test"]) is None
+    assert await reap_expired_jobs() >= 1
+
+    async with get_session_context() as session:
+        job = await session.get(Job, job.id)
+        video = await session.get(Video, video.id)
+    assert (job.status, job.lease_owner) == ("failed", None)
+    assert "stopped responding" in video.approval_note
+
+
+async def test_heartbeat_survives_renewal_errors(monkeypatch):
+    monkeypatch.setattr(settings, "job_lease_seconds", 3)
+    monkeypatch.setattr(worker_module, "HEARTBEAT_RETRY_SECONDS", 0.01)
+    results = iter([RuntimeError("database is locked"), True, False])
+
+    async def renew(job_id, worker_id):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(worker_module, "renew_lease", renew)
+    task = asyncio.create_task(asyncio.sleep(60))
+
+    await WorkerPool(1)._heartbeat("job", task)
+
+    # Error retried, lease renewed, then lost: only the loss cancels the job
+    await asyncio.gather(task, return_exceptions=True)
+    assert task.cancelled()
+
+
+async def test_cancelled_job_is_not_completed(monkeypatch):
+    calls = []
+
+    async def handler(job):
+        asyncio.current_task().cancel()
+        await asyncio.sleep(1)
+
+    async def record(name, *args):
+        calls.append(name)
+
+    monkeypatch.setitem(worker_module.JOB_HANDLERS, "cancel_test", handler)
+    monkeypatch.setattr(worker_module, "complete_job", lambda *a: record("complete"))
+    monkeypatch.setattr(worker_module, "fail_job", lambda *a: record("fail"))
+
+    await WorkerPool(1)._execute(Job(id="j1", kind="cancel_test", payload={}))
+
+    assert calls == []
+
+
+async def make_running_job(owner, kind: str, video_status: str, **job_fields):
+    async with get_session_context() as session:
+        project = await session.get(Project, owner["project_id"])
+        project.status = "in_progress"
+        video = Video(
+            project_id=owner["project_id"],
+            client_id=owner["client_id"],
+            title="V",
+            status=video_status,
+            pipeline_state={"image_prompts": ["a"], "failed_stage": "render"},
+        )
+        session.add(video)
+        await session.flush()
+        job = Job(
+            kind=kind,
+            payload={},
+            status="running",
+            attempts=3,
+            max_attempts=3,
+            lease_owner="w1",
+            video_id=video.id,
+            **job_fields,
+        )
+        session.add(job)
+    return job, video
+
+
+async def load(job, video):
+    async with get_session_context() as session:
+        job = await session.get(Job, job.id)
+        video = await session.get(Video, video.id)
+        project = await session.get(Project, video.project_id)
+    return job, video, project
+
+
+async def test_final_failure_marks_video_and_project_failed(owner):
+    job, video = await make_running_job(owner, "video_pipeline", "rendering")
+
+    await fail_job(job.id, "w1", "render: ffmpeg exited 1")
+
+    job, video, project = await load(job, video)
+    assert (job.status, video.status, project.status) == ("failed", "failed", "failed")
+    # Checkpoints stay so a new job resumes instead of starting over
+    assert video.pipeline_state["image_prompts"] == ["a"]
+
+
+async def test_retried_failure_leaves_video_generating(owner):
+    job, video = await make_running_job(owner, "video_pipeline", "generating")
+    async with get_session_context() as session:
+        (await session.get(Job, job.id)).attempts = 1
+
+    await fail_job(job.id, "w1", "images: timeout")
+
+    job, video, project = await load(job, video)
+    assert (job.status, video.status, project.status) == (
+        "queued",
+        "generating",
+        "in_progress",
+    )
+
+
+async def test_reaped_pipeline_job_marks_video_failed(owner):
+    job, video = await make_running_job(
+        owner,
+        "video_pipeline",
+        "rendering",
+        lease_expires_at=datetime.utcnow() - timedelta(seconds=1),
+    )
+
+    assert await reap_expired_jobs() >= 1
+
+    job, video, project = await load(job, video)
+    assert (video.status, project.status) == ("failed", "failed")
+    assert "stopped responding" in video.approval_note
+
+
+async def test_failed_final_render_keeps_video_approved(owner):
+    job, video = await make_running_job(owner, "render_final", "approved")
+
+    await fail_job(job.id, "w1", "ffmpeg exited 1")
+
+    job, video, project = await load(job, video)
+    assert (job.status, video.status) == ("failed", "approved")
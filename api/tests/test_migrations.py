@@ -0,0 +1,61 @@
+"""Databases built by create_all before migrations existed upgrade cleanly."""
+
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+import database
+from database import _check_schema, _upgrade_schema
+
+ALEMBIC_INI = Path(database.__file__).parent / "alembic.ini"
+
+
+def alembic_config(connection) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = connection
+    return config
+
+
+@pytest.mark.parametrize(
+    "extra_sql",
+    [
+        # Before the job queue
+        [],
+        # After pipeline checkpoints added videos.pipeline_state via create_all
+        ["ALTER TABLE videos ADD COLUMN pipeline_state JSON"],
+    ],
+    ids=["baseline", "with-pipeline-state"],
+)
+def test_legacy_database_upgrades_to_head(tmp_path, extra_sql):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        # The baseline schema without alembic_version, as create_all left it
+        command.upgrade(alembic_config(connection), database.BASELINE_REVISION)
+        connection.execute(text("DROP TABLE alembic_version"))
+        for sql in extra_sql:
+            connection.execute(text(sql))
+
+    with engine.begin() as connection:
+        _upgrade_schema(connection)
+        columns = {c["name"] for c in inspect(connection).get_columns("videos")}
+        version = connection.execute(text("SELECT version_num FROM alembic_version"))
+
+        assert {"pipeline_state", "client_id"} <= columns
+        scripts = ScriptDirectory.from_config(alembic_config(connection))
+        assert version.scalar() == scripts.get_current_head()
+    engine.dispose()
+
+
+def test_model_column_without_migration_fails_at_startup(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'drifted.db'}")
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), "head")
+        connection.execute(text("ALTER TABLE videos DROP COLUMN pipeline_state"))
+
+        with pytest.raises(RuntimeError, match="videos.pipeline_state"):
+            _check_schema(connection)
+    engine.dispose()
@@ -0,0 +1,89 @@
+"""Pipeline stage graph: failures skip dependents, not independent branches."""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from database import get_session_context
+from models.db import Job, Video
+from services import jobs, pipeline
+from services.pipeline import StageFailed, run_stage_graph
+
+
+def recording_stages(fail: set[str] = frozenset(), slow: set[str] = frozenset()):
+    done: list[str] = []
+
+    def stage(name: str):
+        async def run():
+            await asyncio.sleep(0.05 if name in slow else 0)
+            if name in fail:
+                raise RuntimeError(f"{name} exploded")
+            done.append(name)
+
+        return run
+
+    names = ("script", "image_prompts", "images", "voiceover", "render")
+    return {name: stage(name) for name in names}, done
+
+
+async def test_all_stages_run_in_dependency_order():
+    stages, done = recording_stages()
+
+    await run_stage_graph(stages)
+
+    assert set(done) == set(stages)
+    assert done[0] == "script" and done[-1] == "render"
+
+
+async def test_failure_lets_independent_branch_finish():
+    # Images fail while a slower voiceover is still synthesizing
+    stages, done = recording_stages(fail={"images"}, slow={"voiceover"})
+
+    with pytest.raises(StageFailed) as failure:
+        await run_stage_graph(stages)
+
+    assert failure.value.stage == "images"
+    assert "voiceover" in done
+    assert "render" not in done
+
+
+async def test_failure_skips_everything_downstream():
+    stages, done = recording_stages(fail={"script"})
+
+    with pytest.raises(StageFailed) as failure:
+        await run_stage_graph(stages)
+
+    assert failure.value.stage == "script"
+    assert done == []
+
+
+async def test_video_is_attached_to_job_in_the_creating_transaction(monkeypatch):
+    email = f"{uuid.uuid4().hex}@example.com"
+    async with get_session_context() as session:
+        job = Job(kind="generate_video", payload={"email": email}, status="running")
+        session.add(job)
+
+    sessions = 0
+    original = pipeline.get_session_context
+
+    def counting_session_context():
+        nonlocal sessions
+        sessions += 1
+        return original()
+
+    for module in (pipeline, jobs):
+        monkeypatch.setattr(module, "get_session_context", counting_session_context)
+    video_id = await pipeline._get_or_create_video(job)
+    assert sessions == 1
+
+    async with get_session_context() as session:
+        stored = await session.get(Job, job.id)
+        assert stored.video_id == video_id
+        # A resumed run gets the stored job back and reuses the video
+        assert await pipeline._get_or_create_video(stored) == video_id
+        count = await session.scalar(
+            select(func.count()).select_from(Video).where(Video.id == video_id)
+        )
+    assert count == 1
@@ -0,0 +1,304 @@
+"""Replicate completion paths against a fake Replicate API (httpx.MockTransport)."""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from config import get_settings
+from database import get_session_context
+from models.db import ReplicatePrediction
+from services import replicate
+from services.http import provider_clients
+from services.replicate import (
+    PredictionTracker,
+    store_webhook_prediction,
+    verify_webhook_signature,
+)
+
+settings = get_settings()
+
+SECRET = "whsec_" + base64.b64encode(b"test-webhook-secret").decode()
+
+
+class FakeReplicate:
+    """Answers prediction GETs and the list call; records every request."""
+
+    def __init__(
+        self, list_status: int = 200, poll_status: int = 200, cancel_status: int = 200
+    ):
+        self.list_status = list_status
+        self.poll_status = poll_status
+        self.cancel_status = cancel_status
+        self.statuses: dict[str, list[str]] = {}
+        self.list_calls = 0
+        self.poll_calls = 0
+        self.canceled: list[str] = []
+
+    def prediction(self, id: str, *statuses: str) -> dict:
+        """Register a prediction that reports `statuses` on successive polls."""
+        self.statuses[id] = list(statuses)
+        return {
+            "id": id,
+            "status": "starting",
+            "urls": {
+                "get": f"{replicate.API_URL}/predictions/{id}",
+                "cancel": f"{replicate.API_URL}/predictions/{id}/cancel",
+            },
+        }
+
+    def _current(self, id: str) -> dict:
+        statuses = self.statuses[id]
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        return {"id": id, "status": status, "output": [f"https://cdn/{id}.png"]}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/v1")
+        if request.method == "POST" and path.endswith("/cancel"):
+            id = path.split("/")[-2]
+            self.canceled.append(id)
+            if self.cancel_status != 200:
+                return httpx.Response(self.cancel_status)
+            self.statuses[id] = ["canceled"]
+            return httpx.Response(200, json=self._current(id))
+        if path == "/predictions":
+            self.list_calls += 1
+            if self.list_status != 200:
+                return httpx.Response(self.list_status)
+            results = [self._current(id) for id in self.statuses]
+            return httpx.Response(200, json={"results": results})
+        self.poll_calls += 1
+        if self.poll_status != 200:
+            return httpx.Response(self.poll_status)
+        return httpx.Response(200, json=self._current(path.rsplit("/", 1)[-1]))
+
+
+@pytest.fixture
+def fake_replicate(monkeypatch):
+    def install(**kwargs) -> FakeReplicate:
+        fake = FakeReplicate(**kwargs)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+        monkeypatch.setitem(provider_clients._clients, "replicate", client)
+        return fake
+
+    monkeypatch.setattr(settings, "replicate_poll_initial_seconds", 0.05)
+    monkeypatch.setattr(settings, "replicate_poll_max_seconds", 0.2)
+    monkeypatch.setattr(settings, "replicate_batch_poll_threshold", 3)
+    monkeypatch.setattr(settings, "replicate_webhook_url", None)
+    return install
+
+
+@pytest.fixture
+def webhooks(monkeypatch):
+    monkeypatch.setattr(
+        settings, "replicate_webhook_url", "https://api.test/api/webhooks/replicate"
+    )
+    monkeypatch.setattr(settings, "replicate_webhook_secret", SECRET)
+
+
+def sign(body: bytes, webhook_id: str = "msg_1", timestamp: int = None) -> dict:
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    key = base64.b64decode(SECRET.removeprefix("whsec_"))
+    digest = hmac.new(
+        key, f"{webhook_id}.{timestamp}.".encode() + body, hashlib.sha256
+    ).digest()
+    return {
+        "webhook-id": webhook_id,
+        "webhook-timestamp": timestamp,
+        "webhook-signature": f"v1,{base64.b64encode(digest).decode()}",
+    }
+
+
+# ---------- Polling ----------
+
+
+async def test_poll_backs_off_until_succeeded(fake_replicate):
+    fake = fake_replicate()
+    tracker = PredictionTracker()
+    prediction = fake.prediction("p1", "processing", "processing", "succeeded")
+
+    result = await tracker.wait(prediction, timeout=5)
+
+    assert result["status"] == "succeeded"
+    assert fake.poll_calls == 3
+    assert tracker.outstanding == 0
+
+
+async def test_many_due_predictions_use_one_list_call(fake_replicate):
+    fake = fake_replicate()
+    tracker = PredictionTracker()
+    predictions = [fake.prediction(f"p{i}", "succeeded") for i in range(4)]
+
+    results = await asyncio.gather(*(tracker.wait(p, timeout=5) for p in predictions))
+
+    assert {r["status"] for r in results} == {"succeeded"}
+    assert fake.list_calls == 1
+    assert fake.poll_calls == 0
+
+
+async def test_failed_list_call_falls_back_to_individual_polls(fake_replicate):
+    fake = fake_replicate(list_status=429)
+    tracker = PredictionTracker()
+    predictions = [fake.prediction(f"p{i}", "succeeded") for i in range(4)]
+
+    results = await asyncio.gather(*(tracker.wait(p, timeout=5) for p in predictions))
+
+    assert {r["status"] for r in results} == {"succeeded"}
+    assert fake.list_calls == 1
+    assert fake.poll_calls == 4
+
+
+async def test_rate_limited_polls_back_off(fake_replicate):
+    fake = fake_replicate(list_status=429, poll_status=429)
+    tracker = PredictionTracker()
+    predictions = [fake.prediction(f"p{i}", "succeeded") for i in range(4)]
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.gather(*(tracker.wait(p, timeout=1.0) for p in predictions))
+
+    # Backoff (0.05 -> 0.2s) and the replicate_status rate limit leave a few
+    # rounds in a second; without them the list call repeats every 0.05s
+    assert 1 <= fake.list_calls <= 8
+    assert fake.list_calls <= fake.poll_calls <= 4 * fake.list_calls
+
+
+async def test_timed_out_prediction_is_canceled(fake_replicate):
+    fake = fake_replicate()
+    tracker = PredictionTracker()
+    prediction = fake.prediction("slow-1", "processing")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await tracker.wait(prediction, timeout=0.3)
+
+    assert fake.canceled == ["slow-1"]
+    assert tracker.outstanding == 0
+
+
+async def test_cancel_without_url_uses_prediction_path(fake_replicate):
+    fake = fake_replicate()
+    tracker = PredictionTracker()
+    prediction = fake.prediction("slow-2", "processing")
+    del prediction["urls"]["cancel"]
+
+    with pytest.raises(asyncio.TimeoutError):
+        await tracker.wait(prediction, timeout=0.3)
+
+    assert fake.canceled == ["slow-2"]
+
+
+async def test_failed_cancel_still_raises_timeout(fake_replicate):
+    fake = fake_replicate(cancel_status=500)
+    tracker = PredictionTracker()
+    prediction = fake.prediction("slow-3", "processing")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await tracker.wait(prediction, timeout=0.3)
+
+    assert fake.canceled == ["slow-3"]
+
+
+# ---------- Webhooks ----------
+
+
+def test_signature_requires_secret(monkeypatch):
+    monkeypatch.setattr(settings, "replicate_webhook_secret", None)
+    body = b'{"id": "p1"}'
+    assert not verify_webhook_signature(body, "msg_1", str(int(time.time())), "v1,x")
+
+
+def test_signature_checks_hmac_and_timestamp(webhooks):
+    body = b'{"id": "p1", "status": "succeeded"}'
+    headers = sign(body)
+    args = (headers["webhook-id"], headers["webhook-timestamp"])
+
+    signature = headers["webhook-signature"]
+
+    assert verify_webhook_signature(body, *args, signature)
+    assert not verify_webhook_signature(body + b" ", *args, signature)
+
+    stale = sign(body, timestamp=int(time.time()) - 3600)
+    assert not verify_webhook_signature(
+        body, "msg_1", stale["webhook-timestamp"], stale["webhook-signature"]
+    )
+
+
+def test_webhooks_disabled_without_secret(monkeypatch):
+    monkeypatch.setattr(settings, "replicate_webhook_url", "https://api.test/hook")
+    monkeypatch.setattr(settings, "replicate_webhook_secret", None)
+    assert not replicate.webhooks_enabled()
+
+
+async def test_webhook_route_rejects_unsigned(api, monkeypatch):
+    monkeypatch.setattr(settings, "replicate_webhook_url", "https://api.test/hook")
+    monkeypatch.setattr(settings, "replicate_webhook_secret", None)
+    body = {"id": "p1", "status": "succeeded", "output": ["http://169.254.169.254/"]}
+
+    response = await api.post("/api/webhooks/replicate", json=body)
+
+    assert response.status_code == 401
+
+
+async def test_webhook_route_resolves_waiter(api, webhooks, monkeypatch):
+    tracker = PredictionTracker()
+    monkeypatch.setattr(replicate, "prediction_tracker", tracker)
+    prediction = {
+        "id": "hook-1",
+        "status": "processing",
+        "urls": {"get": f"{replicate.API_URL}/predictions/hook-1"},
+    }
+    waiter = asyncio.create_task(tracker.wait(prediction, timeout=5))
+    await asyncio.sleep(0)
+
+    body = json.dumps({"id": "hook-1", "status": "succeeded", "output": ["x"]})
+    response = await api.post(
+        "/api/webhooks/replicate", content=body, headers=sign(body.encode())
+    )
+
+    assert response.status_code == 200
+    assert (await waiter)["output"] == ["x"]
+    # Don't leave a webhook store check running past the test's event loop
+    await tracker._task
+
+
+async def test_webhook_for_other_process_goes_through_store(webhooks):
+    await store_webhook_prediction(
+        {"id": "stored-1", "status": "succeeded", "output": ["y"]}
+    )
+    tracker = PredictionTracker()
+    prediction = {
+        "id": "stored-1",
+        "status": "processing",
+        "urls": {"get": f"{replicate.API_URL}/predictions/stored-1"},
+    }
+
+    result = await tracker.wait(prediction, timeout=5)
+    # The waiter resolves mid-check; let that check commit its delete
+    await tracker._task
+
+    assert result["output"] == ["y"]
+    async with get_session_context() as session:
+        assert await session.get(ReplicatePrediction, "stored-1") is None
+
+
+async def test_unclaimed_webhook_rows_expire(webhooks):
+    old = datetime.utcnow() - timedelta(
+        seconds=settings.replicate_webhook_retention_seconds + 60
+    )
+    async with get_session_context() as session:
+        session.add(
+            ReplicatePrediction(id="orphan-1", status="succeeded", created_at=old)
+        )
+
+    await store_webhook_prediction({"id": "fresh-1", "status": "succeeded"})
+
+    async with get_session_context() as session:
+        ids = set((await session.execute(select(ReplicatePrediction.id))).scalars())
+    assert "orphan-1" not in ids
+    assert "fresh-1" in ids
@@ -0,0 +1,94 @@
+"""Per-scene voiceover: narration per spoken scene, images timed to scenes."""
+
+import pytest
+
+from services.pipeline import image_scenes_from_prompts, timed_images
+from services.video import image_durations, scene_image_durations
+from services.voice import clip_durations_by_scene, script_to_scene_texts
+
+
+def checkpoint(scene_durations, image_scenes=None, images=4) -> dict:
+    return {
+        "image_prompts": [f"prompt {i}" for i in range(images)],
+        "images": {i: f"images/{i}.png" for i in range(images)},
+        "image_scenes": image_scenes,
+        "scene_durations": scene_durations,
+    }
+
+
+def test_hook_and_cta_join_first_and_last_scene():
+    script = {
+        "hook": "Hungry?",
+        "scenes": [{"text": "We bake daily."}, {"text": "Fresh bread."}],
+        "cta": "Visit today.",
+    }
+
+    assert script_to_scene_texts(script) == [
+        (0, "Hungry? We bake daily."),
+        (1, "Fresh bread. Visit today."),
+    ]
+
+
+def test_empty_scenes_keep_their_index():
+    script = {
+        "hook": "Hungry?",
+        "scenes": [{"text": ""}, {"text": "We bake daily."}, {"text": "  "}, {}],
+        "cta": "Visit today.",
+    }
+
+    assert script_to_scene_texts(script) == [(1, "Hungry? We bake daily. Visit today.")]
+
+
+def test_script_without_narration_is_rejected():
+    with pytest.raises(ValueError):
+        script_to_scene_texts({"scenes": [{"text": ""}]})
+
+
+def test_silent_middle_scene_keeps_images_on_their_scenes():
+    script = {"scenes": [{"text": t} for t in ("One", "", "Three", "Four")]}
+    scene_texts = script_to_scene_texts(script)
+    assert [scene for scene, _ in scene_texts] == [0, 2, 3]
+
+    durations = clip_durations_by_scene(scene_texts, [3.0, 3.0, 3.0], 4)
+    assert durations == [3.0, 0.0, 3.0, 3.0]
+
+    urls, held = timed_images(checkpoint(durations))
+    # Scene 3's narration plays over scene 3's image, not the silent one's
+    assert urls == ["images/0.png", "images/2.png", "images/3.png"]
+    assert held == [3.0, 3.0, 3.0]
+
+
+def test_images_are_keyed_by_prompt_scene():
+    prompts = [{"scene": 1}, {"scene": 3}, {"scene": 2}, {"scene": 3}]
+    image_scenes = image_scenes_from_prompts(prompts, scene_count=3)
+    assert image_scenes == [0, 2, 1, 2]
+
+    urls, held = timed_images(checkpoint([2.0, 4.0, 6.0], image_scenes))
+
+    assert urls == ["images/0.png", "images/2.png", "images/1.png", "images/3.png"]
+    assert held == [2.0, 4.0, 3.0, 3.0]
+
+
+def test_prompt_without_valid_scene_uses_position():
+    prompts = [{"scene": 1}, {"scene": "x"}, {}, {"scene": 9}]
+    assert image_scenes_from_prompts(prompts, scene_count=4) == [0, 1, 2, 3]
+
+
+def test_scene_without_image_extends_the_previous_one():
+    assert scene_image_durations([0, 2], [2.0, 1.0, 3.0]) == [3.0, 3.0]
+    assert scene_image_durations([1, 2], [2.0, 1.0, 3.0]) == [3.0, 3.0]
+
+
+def test_single_pass_voiceover_splits_evenly():
+    urls, held = timed_images(checkpoint(None, images=3))
+
+    assert len(urls) == 3
+    assert held is None
+    assert image_durations(3, 9.0, held) == [3.0, 3.0, 3.0]
+
+
+def test_mismatched_durations_map_in_order():
+    assert image_durations(3, 9.0, [2.0, 3.0, 4.0]) == [2.0, 3.0, 4.0]
+    assert image_durations(4, 10.0, [4.0, 6.0]) == [2.0, 2.0, 3.0, 3.0]
+    assert image_durations(2, 9.0, [2.0, 3.0, 4.0]) == [5.0, 4.0]
+    assert image_durations(0, 9.0, [9.0]) == []
@@ -0,0 +1,125 @@
+"""Storage backends: key containment, S3 prefixes, multipart and missing objects."""
+
+from pathlib import Path
+
+import pytest
+
+from services.storage import LocalStorage, S3Storage
+
+boto3 = pytest.importorskip("boto3")
+from botocore.exceptions import ClientError  # noqa: E402
+
+
+class FakeS3Client:
+    """Records calls made through the subset of the boto3 S3 API we use."""
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], bytes] = {}
+        self.uploads: list[dict] = []
+
+    def upload_fileobj(self, f, bucket, key, ExtraArgs=None, Config=None):
+        self.uploads.append({"key": key, "extra": ExtraArgs, "config": Config})
+        self.objects[(bucket, key)] = f.read()
+
+    def put_object(self, Bucket, Key, Body, **extra):
+        self.objects[(Bucket, Key)] = Body
+
+    def download_fileobj(self, bucket, key, f, Config=None):
+        f.write(self.objects[(bucket, key)])
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError(
+                {"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject"
+            )
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3.test/{Params['Bucket']}/{Params['Key']}?e={ExpiresIn}"
+
+
+@pytest.fixture
+def s3(monkeypatch) -> FakeS3Client:
+    client = FakeS3Client()
+    monkeypatch.setattr(boto3, "client", lambda *args, **kwargs: client)
+    return client
+
+
+def test_local_path_rejects_keys_outside_root(tmp_path):
+    store = LocalStorage(tmp_path / "media")
+
+    assert store.path("videos/v1/final.mp4") == (
+        tmp_path / "media" / "videos" / "v1" / "final.mp4"
+    ).resolve()
+    for key in ("../secrets.env", "videos/../../x", "/etc/passwd"):
+        with pytest.raises(ValueError):
+            store.path(key)
+
+
+async def test_s3_keys_carry_the_prefix(s3, tmp_path):
+    store = S3Storage(bucket="renders", prefix="/staging/")
+    source = tmp_path / "final.mp4"
+    source.write_bytes(b"video")
+
+    await store.put_file("videos/v1/final.mp4", source, "video/mp4")
+    await store.put_bytes("videos/v1/voiceover.mp3", b"audio")
+
+    assert set(s3.objects) == {
+        ("renders", "staging/videos/v1/final.mp4"),
+        ("renders", "staging/videos/v1/voiceover.mp3"),
+    }
+    assert s3.uploads[0]["extra"] == {"ContentType": "video/mp4"}
+    assert (await store.url("videos/v1/final.mp4")).startswith(
+        "https://s3.test/renders/staging/videos/v1/final.mp4"
+    )
+
+    dest = await store.download("videos/v1/voiceover.mp3", tmp_path / "out.mp3")
+    assert Path(dest).read_bytes() == b"audio"
+
+
+async def test_s3_without_prefix_uses_key_as_is(s3):
+    store = S3Storage(bucket="renders")
+
+    await store.put_bytes("videos/v1/voiceover.mp3", b"audio")
+
+    assert ("renders", "videos/v1/voiceover.mp3") in s3.objects
+
+
+async def test_s3_multipart_threshold_follows_chunk_size(s3, tmp_path):
+    store = S3Storage(bucket="renders", multipart_chunk_bytes=16 * 1024 * 1024)
+    source = tmp_path / "final.mp4"
+    source.write_bytes(b"video")
+
+    await store.put_file("videos/v1/final.mp4", source)
+
+    config = s3.uploads[0]["config"]
+    assert config.multipart_threshold == 16 * 1024 * 1024
+    assert config.multipart_chunksize == 16 * 1024 * 1024
+    assert s3.uploads[0]["extra"] is None
+
+
+async def test_s3_exists_is_false_for_missing_objects(s3):
+    store = S3Storage(bucket="renders", prefix="staging")
+
+    assert not await store.exists("videos/v1/final.mp4")
+
+    await store.put_bytes("videos/v1/final.mp4", b"video")
+    assert await store.exists("videos/v1/final.mp4")
+
+    await store.delete("videos/v1/final.mp4")
+    assert not await store.exists("videos/v1/final.mp4")
+
+
+async def test_s3_exists_raises_other_errors(s3, monkeypatch):
+    store = S3Storage(bucket="renders")
+
+    def forbidden(Bucket, Key):
+        raise ClientError({"Error": {"Code": "403"}}, "HeadObject")
+
+    monkeypatch.setattr(s3, "head_object", forbidden)
+
+    with pytest.raises(ClientError):
+        await store.exists("videos/v1/final.mp4")
@@ -0,0 +1,70 @@
+"""Workspace sweeping: size eviction must spare renders in other processes."""
+
+import os
+import time
+
+import pytest
+
+from services.workspace import (
+    ACTIVE_MARKER,
+    ACTIVE_TIMEOUT_SECONDS,
+    FAILED_MARKER,
+    WorkspaceManager,
+)
+
+
+@pytest.fixture
+def manager(tmp_path) -> WorkspaceManager:
+    return WorkspaceManager(
+        root=tmp_path,
+        max_bytes=10_000,
+        keep_failed_seconds=3600,
+        stale_seconds=3600,
+        max_total_bytes=1_000,
+    )
+
+
+def make_workspace(root, name: str, size: int, marker: str, age: float = 0) -> None:
+    path = root / name
+    path.mkdir()
+    (path / "frame.png").write_bytes(b"x" * size)
+    (path / marker).write_text("other-host:1234\n")
+    when = time.time() - age
+    os.utime(path / marker, (when, when))
+
+
+async def test_size_eviction_spares_other_process_render(manager, tmp_path):
+    make_workspace(tmp_path, "live", 800, ACTIVE_MARKER)
+    make_workspace(tmp_path, "failed", 800, FAILED_MARKER)
+
+    assert await manager.sweep() == 1
+    assert (tmp_path / "live").exists()
+    assert not (tmp_path / "failed").exists()
+
+
+async def test_size_eviction_takes_render_of_dead_process(manager, tmp_path):
+    make_workspace(
+        tmp_path, "abandoned", 1_500, ACTIVE_MARKER, age=ACTIVE_TIMEOUT_SECONDS + 1
+    )
+
+    assert await manager.sweep() == 1
+    assert not (tmp_path / "abandoned").exists()
+
+
+async def test_own_workspace_is_marked_and_cleaned_up(manager, tmp_path):
+    async with manager.workspace("Launch video") as ws:
+        assert (ws.path / ACTIVE_MARKER).exists()
+        ws.file("out.mp4").write_bytes(b"x" * 2_000)
+        assert await manager.sweep() == 0
+        assert ws.path.exists()
+
+    assert not ws.path.exists()
+
+
+async def test_failed_workspace_drops_active_marker(manager):
+    with pytest.raises(RuntimeError):
+        async with manager.workspace("Launch video") as ws:
+            raise RuntimeError("ffmpeg exited 1")
+
+    assert (ws.path / FAILED_MARKER).exists()
+    assert not (ws.path / ACTIVE_MARKER).exists()
@@ -0,0 +1,146 @@
+"""Write routes issue their lookups plus exactly one write, and no re-read.
+
+Model defaults are all Python-side, so flush() leaves the instance complete;
+a SELECT after the write would mean a refresh() round trip crept back in.
+"""
+
+import uuid
+
+import pytest
+
+from database import get_session_context
+from models.db import Video
+from services import google_drive
+
+
+def verbs(statements: list) -> list[str]:
+    return [sql.lstrip().split(None, 1)[0].upper() for sql, _ in statements]
+
+
+@pytest.fixture
+async def video(api, owner) -> dict:
+    response = await api.post(
+        "/api/videos",
+        json={"project_id": owner["project_id"], "title": "Launch"},
+        headers=owner["headers"],
+    )
+    return response.json()
+
+
+async def set_status(video_id: str, status: str, **fields) -> None:
+    async with get_session_context() as session:
+        row = await session.get(Video, video_id)
+        row.status = status
+        for field, value in fields.items():
+            setattr(row, field, value)
+
+
+async def test_create_client(api, statements):
+    email = f"{uuid.uuid4().hex}@example.com"
+    response = await api.post("/api/clients", json={"name": "New", "email": email})
+
+    assert response.status_code == 201
+    assert response.json()["created_at"]
+    # Duplicate-email check, then the insert
+    assert verbs(statements) == ["SELECT", "INSERT"]
+
+
+async def test_update_client(api, owner, statements):
+    response = await api.patch(
+        f"/api/clients/{owner['client_id']}", json={"name": "Renamed"}
+    )
+
+    assert response.json()["name"] == "Renamed"
+    assert verbs(statements) == ["SELECT", "UPDATE"]
+
+
+async def test_create_project(api, owner, statements):
+    response = await api.post(
+        "/api/projects",
+        json={"client_id": owner["client_id"], "name": "Spring"},
+        headers=owner["headers"],
+    )
+
+    assert response.status_code == 201
+    assert response.json()["status"] == "draft"
+    assert verbs(statements) == ["INSERT"]
+
+
+async def test_update_project(api, owner, statements):
+    response = await api.patch(
+        f"/api/projects/{owner['project_id']}",
+        json={"status": "review"},
+        headers=owner["headers"],
+    )
+
+    assert response.json()["status"] == "review"
+    assert verbs(statements) == ["SELECT", "UPDATE"]
+
+
+async def test_create_video(api, owner, statements):
+    response = await api.post(
+        "/api/videos",
+        json={"project_id": owner["project_id"], "title": "Launch"},
+        headers=owner["headers"],
+    )
+
+    assert response.status_code == 201
+    assert response.json()["status"] == "scripting"
+    # Project ownership check, then the insert
+    assert verbs(statements) == ["SELECT", "INSERT"]
+
+
+async def test_update_video(api, owner, video, statements):
+    response = await api.patch(
+        f"/api/videos/{video['id']}",
+        json={"title": "Relaunch"},
+        headers=owner["headers"],
+    )
+
+    body = response.json()
+    assert body["title"] == "Relaunch"
+    assert body["updated_at"] > video["updated_at"]
+    assert verbs(statements) == ["SELECT", "UPDATE"]
+
+
+async def test_submit_video(api, owner, video, statements):
+    await set_status(video["id"], "draft")
+    statements.clear()
+
+    response = await api.post(
+        f"/api/videos/{video['id']}/submit", headers=owner["headers"]
+    )
+
+    assert response.json()["status"] == "review"
+    assert verbs(statements) == ["SELECT", "UPDATE"]
+
+
+@pytest.mark.parametrize("route, approved", [("approve", True), ("reject", False)])
+async def test_review_video(api, owner, video, statements, route, approved):
+    await set_status(video["id"], "review")
+    statements.clear()
+
+    response = await api.post(
+        f"/api/videos/{video['id']}/{route}",
+        json={"approved": approved, "note": "Looks good"},
+        headers=owner["headers"],
+    )
+
+    assert response.json()["status"] == ("approved" if approved else "draft")
+    assert verbs(statements) == ["SELECT", "UPDATE"]
+
+
+async def test_deliver_video(api, owner, video, statements, monkeypatch):
+    drive = google_drive.drive_service
+    monkeypatch.setattr(drive, "create_client_folder", lambda name: "folder-1")
+    monkeypatch.setattr(drive, "set_file_permissions", lambda *a, **kw: None)
+    await set_status(video["id"], "approved", formats={"vertical": "videos/v.mp4"})
+    statements.clear()
+
+    response = await api.post(
+        f"/api/videos/{video['id']}/deliver", headers=owner["headers"]
+    )
+
+    assert response.json()["status"] == "delivered"
+    # Video, then its project and client (selectinload), then the update
+    assert verbs(statements) == ["SELECT", "SELECT", "SELECT", "UPDATE"]
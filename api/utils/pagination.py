@@ -0,0 +1,59 @@
+"""Keyset (cursor) pagination for newest-first listings.
+
+Pages are ordered by (created_at, id) descending. The cursor is an opaque,
+URL-safe token holding the last row's position, and the next page starts
+strictly after it, so each page costs the same however deep it is. List
+endpoints return the token in the X-Next-Cursor header, keeping the JSON
+body a plain list; skip/offset still works when no cursor is given.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+CURSOR_DESCRIPTION = f"{NEXT_CURSOR_HEADER} from the previous page"
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Parse a cursor; raises HTTP 400 if it was not produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    stmt: Select, model, cursor: Optional[str], skip: int, limit: int
+) -> Select:
+    """
+    Order newest first and apply the cursor (or the offset, without one).
+
+    Fetches one extra row so finish_page can tell whether there is a next page.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def finish_page(rows: list, limit: int, response: Response) -> list:
+    """Trim the look-ahead row and set X-Next-Cursor if there are more rows."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
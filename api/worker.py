@@ -0,0 +1,200 @@
+"""Worker pool entry point: claims queued jobs and runs them.
+
+Run alongside the web process:
+
+    python worker.py
+
+Each process runs `WORKER_CONCURRENCY` jobs at a time. Jobs are claimed with
+a lease that is renewed while they run; if the process dies, the lease
+expires and another worker resumes the job.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import uuid
+
+from config import get_settings
+from database import init_db
+from services.http import provider_clients
+from services.jobs import (
+    claim_job,
+    complete_job,
+    fail_job,
+    release_job,
+    renew_lease,
+    run_reaper,
+)
+from services.pipeline import JOB_HANDLERS
+from services.render_queue import render_scheduler
+from services.replicate import prediction_tracker
+from services.scheduler import provider_metrics
+from services.workspace import workspace_manager
+
+logger = logging.getLogger("worker")
+settings = get_settings()
+
+# Retry delay after a failed lease renewal (e.g. the database was locked)
+HEARTBEAT_RETRY_SECONDS = 5
+
+
+class WorkerPool:
+    """Runs up to `concurrency` jobs at a time until asked to stop."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopping = asyncio.Event()
+        self._running = 0
+
+    def stop(self) -> None:
+        logger.info("Shutdown requested, releasing in-flight jobs")
+        self._stopping.set()
+
+    async def run(self) -> None:
+        await init_db()
+        provider_clients.start()
+        # Removes expired failed workspaces and ones abandoned by dead processes
+        sweeper = asyncio.create_task(
+            workspace_manager.run_sweeper(settings.workspace_sweep_interval_seconds)
+        )
+        # Fails jobs whose worker died on their final attempt
+        reaper = asyncio.create_task(run_reaper(settings.job_reap_interval_seconds))
+        reporter = asyncio.create_task(
+            self._report_metrics(settings.worker_metrics_interval_seconds)
+        )
+        logger.info(
+            f"Worker {self.worker_id} started with concurrency {self.concurrency}"
+        )
+        try:
+            await asyncio.gather(*(self._slot() for _ in range(self.concurrency)))
+        finally:
+            sweeper.cancel()
+            reaper.cancel()
+            reporter.cancel()
+            await provider_clients.aclose()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _slot(self) -> None:
+        """One execution slot: claim, run, repeat."""
+        while not self._stopping.is_set():
+            job = await claim_job(self.worker_id, kinds=list(JOB_HANDLERS))
+            if not job:
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(),
+                        timeout=settings.worker_poll_interval_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._running += 1
+            try:
+                await self._execute(job)
+            finally:
+                self._running -= 1
+
+    async def _execute(self, job) -> None:
+        handler = JOB_HANDLERS[job.kind]
+        task = asyncio.create_task(handler(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, task))
+        stopping = asyncio.create_task(self._stopping.wait())
+
+        try:
+            await asyncio.wait({task, stopping}, return_when=asyncio.FIRST_COMPLETED)
+
+            if not task.done():
+                # Graceful shutdown: hand the job back without burning an attempt
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await release_job(job.id, self.worker_id)
+                return
+
+            if task.cancelled():
+                # The heartbeat lost the lease: the job was reaped or another
+                # worker owns it now, so there is nothing to record here
+                logger.warning(f"Job {job.id} cancelled after losing its lease")
+                return
+
+            exc = task.exception()
+            if exc:
+                logger.exception(f"Job {job.id} raised", exc_info=exc)
+                await fail_job(job.id, self.worker_id, str(exc))
+            else:
+                await complete_job(job.id, self.worker_id)
+        finally:
+            heartbeat.cancel()
+            stopping.cancel()
+
+    def metrics(self) -> dict:
+        return {
+            "process": "worker",
+            "worker_id": self.worker_id,
+            "jobs_running": self._running,
+            "concurrency": self.concurrency,
+            "predictions_outstanding": prediction_tracker.outstanding,
+            "providers": provider_metrics(),
+            # The per-render history stays out of the periodic log line
+            "render": {
+                k: v for k, v in render_scheduler.metrics().items() if k != "recent"
+            },
+        }
+
+    async def _report_metrics(self, interval_seconds: float) -> None:
+        """
+        Log this process's scheduler metrics every `interval_seconds`.
+
+        Provider calls and renders run here, not in the web process, so this is
+        where queue depth and wait times are meaningful.
+        """
+        if interval_seconds <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval_seconds)
+            logger.info(f"Metrics {json.dumps(self.metrics())}")
+
+    async def _heartbeat(self, job_id: str, task: asyncio.Task) -> None:
+        """
+        Renew the lease at a third of its length while the job runs.
+
+        A failed renewal (database locked, connection dropped) is retried
+        after HEARTBEAT_RETRY_SECONDS; only a lease that is actually gone
+        cancels the job.
+        """
+        interval = max(1, settings.job_lease_seconds // 3)
+        delay = interval
+        while not task.done():
+            await asyncio.sleep(delay)
+            try:
+                renewed = await renew_lease(job_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Lease renewal for job {job_id} failed, retrying: {e}")
+                delay = min(interval, HEARTBEAT_RETRY_SECONDS)
+                continue
+            delay = interval
+            if not renewed:
+                logger.error(f"Lost lease on job {job_id}, cancelling")
+                task.cancel()
+                return
+
+
+async def main() -> None:
+    pool = WorkerPool(concurrency=settings.worker_concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, pool.stop)
+
+    await pool.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG if settings.debug else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    asyncio.run(main())
@@ -2,7 +2,7 @@
 
 import os
 import httpx
-from typing import Optional
+from typing import Iterator, Optional
 
 API_URL = os.getenv("BOM_API_URL", "https://bom-studios-api.ondigitalocean.app")
 
@@ -25,6 +25,32 @@ class APIClient:
         """Set auth token after login."""
         self.token = token
 
+    def _iter_pages(self, path: str, params: dict = None, page_size: int = 100) -> Iterator[dict]:
+        """
+        Yield every item of a list endpoint, one page at a time.
+
+        Follows the X-Next-Cursor header until the last page. Stops quietly on
+        an error, so callers get whatever was fetched up to that point.
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        params["limit"] = page_size
+        while True:
+            try:
+                r = self._client.get(
+                    f"{self.base_url}{path}",
+                    params=params,
+                    headers=self._headers(),
+                )
+                if r.status_code != 200:
+                    return
+                yield from r.json()
+            except Exception:
+                return
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                return
+            params["cursor"] = cursor
+
     # Health
     def health(self) -> dict:
         """Check API health."""
@@ -60,26 +86,12 @@ class APIClient:
     # Clients
     def get_clients(self) -> list:
         """Get all clients."""
-        try:
-            r = self._client.get(
-                f"{self.base_url}/api/clients",
-                headers=self._headers(),
-            )
-            return r.json() if r.status_code == 200 else []
-        except Exception:
-            return []
+        return list(self._iter_pages("/api/clients"))
 
     # Projects
     def get_projects(self) -> list:
         """Get all projects."""
-        try:
-            r = self._client.get(
-                f"{self.base_url}/api/projects",
-                headers=self._headers(),
-            )
-            return r.json() if r.status_code == 200 else []
-        except Exception:
-            return []
+        return list(self._iter_pages("/api/projects"))
 
     def get_project(self, project_id: str) -> Optional[dict]:
         """Get single project."""
@@ -93,16 +105,13 @@ class APIClient:
             return None
 
     # Videos
+    def iter_videos(self, project_id: str = None, page_size: int = 100) -> Iterator[dict]:
+        """Lazily iterate all videos, optionally filtered by project."""
+        return self._iter_pages("/api/videos", {"project_id": project_id}, page_size)
+
     def get_videos(self, project_id: str = None) -> list:
         """Get all videos, optionally filtered by project."""
-        try:
-            url = f"{self.base_url}/api/videos"
-            if project_id:
-                url += f"?project_id={project_id}"
-            r = self._client.get(url, headers=self._headers())
-            return r.json() if r.status_code == 200 else []
-        except Exception:
-            return []
+        return list(self.iter_videos(project_id))
 
     def approve_video(self, video_id: str) -> bool:
         """Approve a video."""